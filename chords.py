@@ -0,0 +1,125 @@
+# chord tables
+
+import re
+from functools import lru_cache
+
+from notes import nNotes, getNoteIdx
+
+# intervals (semitones above the root) for each chord quality;
+# same qualities as the chord subcommand in fret.py
+ChordIntervals = {
+    '': (0, 4, 7),              # major
+    'm': (0, 3, 7),             # minor
+    '7': (0, 4, 7, 10),         # dominant 7th
+    'maj7': (0, 4, 7, 11),      # major 7th
+    'm7': (0, 3, 7, 10),        # minor 7th
+    'aug': (0, 4, 8),           # augmented
+    'dim': (0, 3, 6),           # diminished
+}
+
+# triads by the quality written after the root
+Triads = {
+    '': ChordIntervals[''],
+    'maj': ChordIntervals[''], 'Maj': ChordIntervals[''],
+    'M': ChordIntervals[''], 'dom': ChordIntervals[''],
+    'm': ChordIntervals['m'], 'min': ChordIntervals['m'],
+    'mi': ChordIntervals['m'], '-': ChordIntervals['m'],
+    'aug': ChordIntervals['aug'], '+': ChordIntervals['aug'],
+    'dim': ChordIntervals['dim'], 'o': ChordIntervals['dim'],
+}
+# qualities that make a 7th major
+MajorSevenths = ('maj', 'Maj', 'M', '^')
+
+# degrees named in extensions, alterations and adds: semitones above root
+DegreeSemitones = {'2': 2, '4': 5, '5': 7, '6': 9, '7': 10, '9': 2,
+                   '11': 5, '13': 9}
+
+# chart notation: root, quality, extension (which may be in
+# parentheses, as in Cm(maj7)), then any number of alterations, sus and
+# add/no clauses, and a slash bass
+Extension = r'(?:maj|Maj|M|\^)?(?:7|9|11|13)|6/9|69|6|5'
+ChordSymbol = re.compile(r'''
+    (?P<root>[A-Ga-g][#b]?)
+    (?P<quality>maj|Maj|min|mi|dim|aug|dom|M|m|-|\+|o)?
+    (?:(?P<ext>{ext})|\((?P<pext>{ext})\))?
+    (?P<mods>(?:sus[24]?|add[#b]?(?:2|4|6|9|11|13)|no[35]|
+              [#b](?:5|9|11|13)|[(),])*)
+    (?:/(?P<bass>[A-Ga-g][#b]?))?
+    $'''.format(ext=Extension), re.VERBOSE)
+Modifier = re.compile(r'sus[24]?|add[#b]?\d+|no[35]|[#b]\d+')
+
+
+def chordMask(root, intervals):
+    '''bit mask of the pitch classes (index into Notes) in a chord'''
+    mask = 0
+    for i in intervals:
+        mask |= 1 << ((root + i) % nNotes)
+    return mask
+
+
+def _accidental(text):
+    '''semitones for a degree like "b9" or "#11"'''
+    shift = {'b': -1, '#': 1}.get(text[0], 0)
+    return (DegreeSemitones[text.lstrip('#b')] + shift) % nNotes
+
+
+@lru_cache(maxsize=4096)
+def parseChord(symbol):
+    '''(root index, intervals, bass index or None) for a chord symbol like
+    "C", "F#m", "C#m7b5", "Cm(maj7)", "Gmaj9#11/B", "Ebsus4add9" or
+    "F/C"; raises ValueError if not understood. Results are cached by
+    symbol.'''
+    match = ChordSymbol.match(symbol)
+    if not match:
+        raise ValueError('unknown chord "{}"'.format(symbol))
+    quality, ext, mods = match.group('quality', 'ext', 'mods')
+    quality = quality or ''
+    ext = ext or match.group('pext')
+    tones = set(Triads[quality])
+
+    if ext == '5':
+        tones = {0, 7}          # power chord
+    elif ext in ('6', '69', '6/9'):
+        tones.add(9)
+        if ext != '6':
+            tones.add(2)
+    elif ext:
+        major = ext[0] in 'Mm^' or quality in MajorSevenths
+        number = ext.lstrip('majMaj^')
+        if quality in ('dim', 'o') and not major:
+            tones.add(9)        # diminished 7th
+        else:
+            tones.add(11 if major else 10)
+        # each extension includes the ones below it; the 11th is left
+        # out of a 13th chord
+        if number in ('9', '11', '13'):
+            tones.add(2)
+        if number == '11':
+            tones.add(5)
+        if number == '13':
+            tones.add(9)
+
+    for mod in Modifier.findall(mods):
+        if mod.startswith('sus'):
+            tones -= {3, 4}
+            tones.add(2 if mod == 'sus2' else 5)
+        elif mod.startswith('add'):
+            tones.add(_accidental(mod[3:]))
+        elif mod.startswith('no'):
+            tones -= {3, 4} if mod == 'no3' else {7}
+        else:
+            # altered 5th replaces the fifth, altered 9th the 9th
+            if mod[1:] == '5':
+                tones.discard(7)
+            elif mod[1:] == '9':
+                tones.discard(2)
+            tones.add(_accidental(mod))
+
+    try:
+        root = getNoteIdx(match.group('root'))
+        bass = match.group('bass')
+        bass = None if bass is None else getNoteIdx(bass)
+    except ValueError:
+        raise ValueError('unknown chord "{}"'.format(symbol))
+    return root, tuple(sorted(tones)), bass
+
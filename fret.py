@@ -8,299 +8,90 @@ Shows notes on the guitar. Three major modes: (1) individual notes;
 __author__ = "VW Freeh"
 
 import argparse
+import os
+import wave
 from random import randint
 
-from notes import Notes, nNotes, nextNote, getNoteIdx, getNotes
+from notes import Notes, nextNote, getNoteIdx
+from fretboard import Ticks, noteBoard, degreeGrid, chordTones, chordPanorama
+from fretboard import scaleNotes, triads, caged, boxes, boxForm
+from fretboard import boxFormDegrees
+from tuning import Standard, parseTuning, tuningName, showTunings
+from voicedb import DefaultPath, buildDb, chordVoicings, voicingName
+from svg import Sheet, librarySheet
+from tab import showTab
+from harmonize import showHarmony
 
 Roots = ['E', 'B', 'G', 'D', 'A', 'E']
-# these are the marks on the guitar neck
-Ticks = ['', '', '*', '', '*', '', '**', '', '*', '', '', '**',
-         '', '', '*', '', '*']
-
-# major scale: WWhWWWh
-# NOTE:   1 - 2 - 3 4 - 5 - 6  -  7  8
-# OFFSET: 0 1 2 3 4 5 6 7 8 9 10 11 12
-# major: 1, 3, 5 -- 0, 4, 7
-majorNotes = lambda n:\
-    (Notes[n], Notes[(n+4) % nNotes], Notes[(n+7) % nNotes], )
-# minor: 1, b3, 5 -- 0, 3, 7
-minorNotes = lambda n:\
-    (Notes[n], Notes[(n+3) % nNotes], Notes[(n+7) % nNotes], )
-# 7th: 1, 3, 5, b7 -- 0, 4, 7, 10
-seventhNotes = lambda n:\
-    (Notes[n], Notes[(n+4) % nNotes], Notes[(n+7) % nNotes],
-     Notes[(n+10) % nNotes], )
-# min7: 1, b3, 5, b7 -- 0, 3, 7, 10
-minor7Notes = lambda n:\
-    (Notes[n], Notes[(n+3) % nNotes], Notes[(n+7) % nNotes],
-     Notes[(n+10) % nNotes], )
-# maj7: 1, 3, 5, 7 -- 0, 4, 7, 11
-major7Notes = lambda n:\
-    (Notes[n], Notes[(n+4) % nNotes], Notes[(n+7) % nNotes],
-     Notes[(n+11) % nNotes], )
-# aug: 1, 3, #5 -- 0, 4, 8
-augNotes = lambda n:\
-    (Notes[n], Notes[(n+4) % nNotes], Notes[(n+8) % nNotes], )
-# dim: 1, b3, b5 -- 0, 3, 6
-dimNotes = lambda n:\
-    (Notes[n], Notes[(n+3) % nNotes], Notes[(n+6) % nNotes], )
-
-
-def showNotes(args):
-    print("|".join([' %-2d ' % (i, ) for i in range(args.frets)]))
-    print('+'.join(['-'*4]*args.frets))
-
-    # E string (offset 7)
-    eNotes = getNotes(args.notes, 7, args.frets)
-    print("|".join([' {:2s} '.format(note) for note in eNotes]))
-    # B string (offset 2)
-    print("|".join([' {:2s} '.format(note)
-                    for note in getNotes(args.notes, 2, args.frets)]))
-    # G string (offset 10)
-    print("|".join([' {:2s} '.format(note)
-                    for note in getNotes(args.notes, 10, args.frets)]))
-    # D string (offset 5)
-    print("|".join([' {:2s} '.format(note)
-                    for note in getNotes(args.notes, 5, args.frets)]))
-    # A string (offset 0)
-    print("|".join([' {:2s} '.format(note)
-                    for note in getNotes(args.notes, 0, args.frets)]))
-    # E string again
-    print("|".join([' {:2s} '.format(note) for note in eNotes]))
-
-    print('+'.join(['-'*4]*(args.frets)) + "+")
+
+# subcommands that can draw to --svg
+SvgViews = ['note', 'chord', 'scale', 'box', 'caged']
+
+
+def printBoard(board):
+    '''print a Board with the fret numbers and neck marks'''
+    frets = board.frets
+    print("|".join([' %-2d ' % (i, ) for i in range(frets)]))
+    print('+'.join(['-'*4]*frets))
+    for row in board.grid:
+        print("|".join([' {:2s} '.format(note) for note in row]))
+    print('+'.join(['-'*4]*(frets)) + "+")
     print('    |' + '|'.join(
-        [" {:2s} ".format(tick) for tick in Ticks[:args.frets-1]]))
-
-
-def showTriads(root_name):
-    root = (Notes.index(root_name) + 5) % 12  # set for the lo E string
-    a = (root + 9) % 12
-    e = (root + 1) % 12
-    d = (root + 4) % 12
-    if a < 2:
-        a += 12
-    if e == 0:
-        e = 12
-    if d == 0:
-        d = 12
-    frets = max(12, a+3, e+1, d+3) + 1
-
-    print('Triads for {}'.format(root_name))
+        [" {:2s} ".format(tick) for tick in Ticks[:frets-1]]))
+
+
+def showNotes(args, title=''):
+    '''show args.notes on the neck; with args.degrees set to a root
+    index, label them with their interval above that root. With
+    args.sheet, add the board to that SVG sheet instead of printing'''
+    board = noteBoard(args.notes, args.frets, getattr(args, 'degrees', None))
+    sheet = getattr(args, 'sheet', None)
+    if sheet is not None:
+        sheet.add(title, board.grid)
+    else:
+        printBoard(board)
+
+
+def printShapes(shapes, degrees=False):
+    '''print CAGED shapes or triads, the root marked on the fret numbers'''
+    grid = shapes.grid
+    if degrees:
+        grid = degreeGrid(grid, Notes.index(shapes.root))
+    frets = len(grid[0])
     fret_str = ["%-2d" % (i, ) for i in range(frets)]
-    fret_str[root] = "{:2s}".format(root_name)
+    fret_str[shapes.rootFret] = "{:2s}".format(shapes.root)
     print("|".join([' {} '.format(i) for i in fret_str]))
     print('+'.join(['-'*4]*frets))
+    for row in grid:
+        print("|".join([' {:2s} '.format(note) for note in row]))
 
-    # print E (hi)
-    notes = [' '] * frets
-    notes[a-2] = "A"
-    notes[a+3] = "G"
-    notes[d] = "D"
-    print("|".join([' {:2s} '.format(note) for note in notes]))
-
-    # print B
-    notes = [' '] * frets
-    notes[a] = "AG"
-    notes[d+1] = "DC"
-    print("|".join([' {:2s} '.format(note) for note in notes]))
-
-    # print G
-    notes = [' '] * frets
-    notes[a] = "AG"
-    notes[e] = "E"
-    notes[d] = "DC"
-    print("|".join([' {:2s} '.format(note) for note in notes]))
-
-    # print D
-    notes = [' '] * frets
-    notes[a] = "AG"
-    notes[e+1] = "ED"
-    notes[d+2] = "C"
-    print("|".join([' {:2s} '.format(note) for note in notes]))
-
-    # print A
-    notes = [' '] * frets
-    notes[a-2] = "A"
-    notes[a+2] = "G"
-    notes[e+1] = "E"
-    notes[d+3] = "C"
-    print("|".join([' {:2s} '.format(note) for note in notes]))
-
-    # print E (lo)
-    notes = [' '] * frets
-    notes[a+3] = "G"
-    print("|".join([' {:2s} '.format(note) for note in notes]))
-
-
-def showCaged(root_name):
-    root = (Notes.index(root_name) + 5) % 12  # set for the lo E string
-    c = (root + 4) % 12
-    a = (root + 7) % 12
-    g = (root + 9) % 12
-    e = (root) % 12
-    d = (root + 2) % 12
 
-    '''
-    if c == 0:
-        c = 12
-    if a == 0:
-        a = 12
-    if g == 0:
-        g = 12
-    if e == 0:
-        e = 12
-    if d == 0:
-        d = 12
-    '''
-    frets = max(12, c+3, a+2, g+3, e+2, d+3) + 1
-    # print(root_name, root, a, e, d, frets)
+def sheetShapes(sheet, title, shapes, degrees=False):
+    '''add CAGED shapes or triads to an SVG sheet'''
+    grid = shapes.grid
+    if degrees:
+        grid = degreeGrid(grid, Notes.index(shapes.root))
+    sheet.add(title, grid)
 
-    print('CAGED for {} ---'.format(root_name),
-          f'C:{c} A:{a} G:{g} E:{e} D:{d}')
 
-    fret_str = ["%-2d " % (i, ) for i in range(frets)]
-    fret_str[root] = '{:2} '.format(root_name)
-    print("|".join([' {}'.format(i) for i in fret_str]))
-    print('+'.join(['-'*4]*frets))
+def showTriads(root_name, degrees=False, sheet=None):
+    shapes = triads(root_name)
+    title = 'Triads for {}'.format(root_name)
+    if sheet is not None:
+        sheetShapes(sheet, title, shapes, degrees)
+        return
+    print(title)
+    printShapes(shapes, degrees)
 
-    # print E (hi)
-    notes = [[' '] * 2 for i in range(frets)]
-    notes[c][0] = "C"
-    notes[a][0] = "A"
-    notes[g+3][0] = "G"
-    if notes[e][0] == ' ':
-        notes[e][0] = "E"
-    else:
-        notes[e][1] = "E"
-    if notes[d+2][0] == ' ':
-        notes[d+2][0] = "D"
-    else:
-        notes[d+2][1] = "D"
-    print("|".join([' {}{} '.format(*note) for note in notes]))
-
-    # print B
-    notes = [[' '] * 2 for i in range(frets)]
-    notes[c+1][0] = "C"
-    notes[a+2][0] = "A"
-    if notes[g][0] == ' ':
-        notes[g][0] = "G"
-    else:
-        notes[g][1] = "G"
-    notes[e][0] = "E"
-    if notes[d+3][0] == ' ':
-        notes[d+3][0] = "D"
-    else:
-        notes[d+3][1] = "D"
-    print("|".join([' {}{} '.format(*note) for note in notes]))
-
-    # print G
-    notes = [[' '] * 2 for i in range(frets)]
-    notes[c][0] = "C"
-    notes[a+2][0] = "A"
-    if notes[g][0] == ' ':
-        notes[g][0] = "G"
-    else:
-        notes[g][1] = "G"
-    notes[e+1][0] = "E"
-    if notes[d+2][0] == ' ':
-        notes[d+2][0] = "D"
-    else:
-        notes[d+2][1] = "D"
-    print("|".join([' {}{} '.format(*note) for note in notes]))
-
-    # print D
-    notes = [' '] * frets
-    notes = [[' '] * 2 for i in range(frets)]
-    notes[c+2][0] = "C"
-    notes[a+2][0] = "A"
-    if notes[g][0] == ' ':
-        notes[g][0] = "G"
-    else:
-        notes[g][1] = "G"
-    notes[e+2][0] = "E"
-    if notes[d][0] == ' ':
-        notes[d][0] = "D"
-    else:
-        notes[d][1] = "D"
-    print("|".join([' {}{} '.format(*note) for note in notes]))
-
-    # print A
-    notes = ['  '] * frets
-    notes = [[' '] * 2 for i in range(frets)]
-    notes[c+3][0] = "C"
-    if notes[a][0] == ' ':
-        notes[a][0] = "A"
-    else:
-        notes[a][1] = "A"
-    notes[g+2][0] = "G"
-    notes[e+2][0] = "E"
-    print("|".join([' {}{} '.format(*note) for note in notes]))
-
-    # print E (lo)
-    notes = ['  '] * frets
-    notes = [[' '] * 2 for i in range(frets)]
-    notes[g+3][0] = "G"
-    if notes[e][0] == ' ':
-        notes[e][0] = "E"
-    else:
-        notes[e][1] = "E"
-    print("|".join([' {}{} '.format(*note) for note in notes]))
-
-
-BoxStrings = {}
-BoxStrings['g'] = [
-    ['m', ' ', ' ', 'M', ' '],
-    ['*', ' ', ' ', '*', ' '],
-    ['M', ' ', '*', ' ', ' '],
-    ['*', ' ', 'm', ' ', ' '],
-    ['*', ' ', '*', ' ', ' '],
-    ['m', ' ', ' ', 'M', ' '],
-]
-BoxStrings['e'] = [
-    [' ', 'M', ' ', '*', ' '],
-    [' ', '*', ' ', 'm', ' '],
-    ['*', ' ', '*', ' ', ' '],
-    ['m', ' ', ' ', 'M', ' '],
-    ['*', ' ', ' ', '*', ' '],
-    [' ', 'M', ' ', '*', ' '],
-]
-BoxStrings['d'] = [
-    [' ', '*', ' ', '*', ' '],
-    [' ', 'm', ' ', ' ', 'M'],
-    ['*', ' ', ' ', '*', ' '],
-    [' ', 'M', ' ', '*', ' '],
-    [' ', '*', ' ', 'm', ' '],
-    [' ', '*', ' ', '*', ' '],
-]
-BoxStrings['c'] = [
-    ['*', ' ', ' ', '*', ' '],
-    [' ', 'M', ' ', '*', ' '],
-    ['*', ' ', 'm', ' ', ' '],
-    ['*', ' ', '*', ' ', ' '],
-    ['m', ' ', ' ', 'M', ' '],
-    ['*', ' ', ' ', '*', ' '],
-]
-BoxStrings['a'] = [
-    [' ', '*', ' ', 'm', ' '],
-    [' ', '*', ' ', '*', ' '],
-    ['m', ' ', ' ', 'M', ' '],
-    ['*', ' ', ' ', '*', ' '],
-    [' ', 'M', ' ', '*', ' '],
-    [' ', '*', ' ', 'm', ' '],
-]
-
-# frets for all boxes
-# offset is
-# E hi
-BoxAll = [
-    ['  ', 'de', '  ', 'dc', '  ', '  ', 'ca', '  ', 'ag', '  ', '  ', 'MM', ],
-    ['  ', 'mm', '  ', '  ', 'M ', '  ', 'ca', '  ', 'ag', '  ', '  ', 'ge', ],
-    ['de', '  ', '  ', 'dc', '  ', 'mm', '  ', '  ', 'MM', '  ', 'ge', '  ', ],
-    ['  ', 'MM', '  ', 'dc', '  ', 'ca', '  ', '  ', 'ag', '  ', 'mm', '  ', ],
-    ['  ', 'de', '  ', 'mm', '  ', '  ', 'MM', '  ', 'ag', '  ', 'ge', '  ', ],
-    ['  ', 'de', '  ', 'dc', '  ', '  ', 'ca', '  ', 'ag', '  ', '  ', 'MM', ],
-]
+
+def showCaged(root_name, degrees=False, sheet=None):
+    shapes = caged(root_name)
+    if sheet is not None:
+        sheetShapes(sheet, 'CAGED for {}'.format(root_name), shapes, degrees)
+        return
+    print('CAGED for {} ---'.format(root_name),
+          ' '.join('{}:{}'.format(*p) for p in shapes.positions.items()))
+    printShapes(shapes, degrees)
 
 
 def box(args):
@@ -309,65 +100,81 @@ def box(args):
         if args.form:
             print('form arg ignored')
 
-        print('All box scales for', args.root.upper())
+        if args.sheet is None:
+            print('All box scales for', args.root.upper())
 
-        frets = 15
-        try:
-            root = 12 - (Notes.index(args.root.upper()) + 5) % 12
-        except ValueError:
-            assert False,'invalid note "{}"'.format(args.root)
+        layout = boxes(args.root)
+        grid = layout.grid
+        if args.degrees:
+            # label each marked fret by its interval above the root
+            grid = degreeGrid(grid, Notes.index(layout.root))
+        if args.sheet is not None:
+            args.sheet.add('All box scales for ' + layout.root, grid)
+            return
 
+        frets = len(grid[0]) - 1
         print(" 0 ||" +
               "|".join([' {:-2d} '.format(i) for i in range(1, frets+1)]))
         print('---++' + '+'.join(['-'*4]*(frets)))
-        for i in range(6):
-            # set for the lo E string
-            string = BoxAll[i][root:] + BoxAll[i][:root]
-            string += string[:3]
-            print('{:2s} ||'.format(string[11]), " | ".join(string))
+        for row in grid:
+            print('{:2s} ||'.format(row[0]),
+                  " | ".join(['{:2s}'.format(mark) for mark in row[1:]]))
     else:
-        boxnames = ['g', 'e', 'd', 'c', 'a']
-        form = args.form.lower()
-        try:
-            form = int(form)
-            form = boxnames[form-1]
-        except IndexError:
-            assert False, 'unknown box form'
-        except ValueError:
-            pass
-
-        frets = 5
-        try:
-            strings = BoxStrings[form]
-        except KeyError:
-            assert False, 'unknown box form'
-
-        print('Pentatonic form {}'.format(form.upper()))
+        layout = boxForm(args.form)
+        grid = layout.grid
+        if args.degrees:
+            # a form has no key: label intervals above its major root
+            grid = boxFormDegrees(layout)
+        title = 'Pentatonic form {}'.format(layout.form.upper())
+        if args.sheet is not None:
+            args.sheet.add(title, grid, 1)
+            return
+
+        frets = len(grid[0])
+        print(title)
         print("|".join([' {:-2d} '.format(i) for i in range(1, frets+1)]))
         print('+'.join(['-'*4]*frets))
 
-        for string in strings:
-            print("|".join([' {}  '.format(note) for note in string]))
+        for string in grid:
+            print("|".join([' {:2s} '.format(note) for note in string]))
+
+
+def showVoicings(args, symbol, tones):
+    '''print the easiest args.voicings voicings of a chord'''
+    tuning = parseTuning(args.tuning) if args.tuning else Standard
+    found = chordVoicings(symbol, tuning, args.frets)
+    print('Chord: {} -- {}, {} voicings in {}\n'.format(
+        tones.name, ', '.join(tones.notes), len(found), tuningName(tuning)))
+    for voicing in found[:args.voicings]:
+        print(voicingName(voicing))
+
+
+def gameBoard(string, fret, frets):
+    '''lines of the "name that note" board, with fret marked on string'''
+    lines = []
+    divider = '+'.join(['-'*4]*(frets+1)) + "+"
+    lines.append(" 0 ||" + "|".join(
+        [' %-2d ' % (i, ) for i in range(1, frets+1)]) + "|")
+    lines.append(divider)
+    marks = [' '] * (frets + 1)
+    for i in range(6):
+        if string == i:
+            marks[fret] = '*'
+            lines.append(" {} ||".format(marks[0]) + "|".join(
+                [' {}  '.format(mark) for mark in marks[1:]]) + "|")
+        else:
+            lines.append("   ||" + "|".join(['    '] * frets) + "|")
+    lines.append(divider)
+    lines.append('   ||' + '|'.join(
+        [" {:2s} ".format(tick) for tick in Ticks[:frets]]) + "|")
+    return lines
 
 
 def playNoteGame(args):
     '''play guess that note'''
     def showBoard(string, fret):
-        divider = '+'.join(['-'*4]*(args.frets+1)) + "+"
-        print(" 0 ||" + "|".join(
-            [' %-2d ' % (i, ) for i in range(1, args.frets+1)]) + "|")
-        print(divider)
-        marks = [' '] * (args.frets + 1)
-        for i in range(6):
-            if string == i:
-                marks[fret] = '*'
-                print(" {} ||".format(marks[0]) + "|".join(
-                    [' {}  '.format(mark) for mark in marks[1:]]) + "|")
-            else:
-                print("   ||" + "|".join(['    '] * args.frets) + "|")
-        print(divider)
-        print('   ||' + '|'.join(
-            [" {:2s} ".format(tick) for tick in Ticks[:args.frets]]) + "|")
+        for line in gameBoard(string, fret, args.frets):
+            print(line)
 
     nNotes = 6 * args.frets
     count, correct = 0, 0
@@ -412,61 +219,37 @@ def chord(args):
     #        setattr(args, 'seventh', args.__dict__['7'])
     if nflags > 1:
         raise ValueError('too many chord types')
-    chord = args.root.title()
 
-    idx = getNoteIdx(chord)
     if args.minor:
-        args.notes = minorNotes(idx)
-        sup = 'min'
+        quality = 'm'
     elif args.seventh:
-        args.notes = seventhNotes(idx)
-        sup = '7'
+        quality = '7'
     elif args.aug:
-        args.notes = augNotes(idx)
-        sup = 'Aug'
+        quality = 'aug'
     elif args.major7:
-        args.notes = major7Notes(idx)
-        sup = 'Maj7'
+        quality = 'maj7'
     elif args.minor7:
-        args.notes = minor7Notes(idx)
-        sup = 'min7'
+        quality = 'm7'
     elif args.dim:
-        args.notes = dimNotes(idx)
-        sup = 'Dim'
+        quality = 'dim'
     else:
-        args.notes = majorNotes(idx)
-        print('n', idx, args.notes)
-        sup = 'Maj'
-
-    print('Chord: {}{} -- {}\n'.format(
-        chord, sup, ', '.join(args.notes)))
+        quality = ''
+    tones = chordTones(args.root, quality)
+    if args.voicings:
+        showVoicings(args, args.root + quality, tones)
+        return
+    if not tones.quality:
+        print('n', getNoteIdx(tones.root), tones.notes)
+
+    args.notes = tones.notes
+    print('Chord: {} -- {}\n'.format(tones.name, ', '.join(args.notes)))
+    args.degrees = getNoteIdx(tones.root) if args.degrees else None
     args.frets += 1
-    showNotes(args)
-
-
-CHROMATIC_NOTES = "C-D-EF-G-A-B"
+    showNotes(args, 'Chord: ' + tones.name)
 
 
 def panorama(args):
     '''show panorama'''
-    def rotate(s, n):
-        return s[n:] + s[:n]
-
-    labels = [
-        'ROOT',
-        'b SECOND',
-        'SECOND',
-        'b THIRD',
-        'THIRD',
-        'FOURTH',
-        'dim FIFTH',
-        'FIFTH',
-        'aug FIFTH',
-        'SIXTH',
-        'b SEVENTH',
-        'SEVENTH',
-    ]
-
     fmt = "{:10s} {:s}"
     if args.minor:
         notes = [0, 3, 7]
@@ -482,8 +265,8 @@ def panorama(args):
     elif args.major7:
         notes.append(11)        # add seventh
 
-    for n in notes:
-        print(fmt.format(labels[n], rotate(CHROMATIC_NOTES, n)))
+    for label, row in chordPanorama(notes):
+        print(fmt.format(label, row))
 
 
 def main():
@@ -494,6 +277,9 @@ def main():
     parser = argparse.ArgumentParser(description=main.__doc__)
     parser.add_argument('-f', '--frets', type=int, default=12,
                         help='select number of frets (default=12)')
+    parser.add_argument('--svg', type=str, action='store', metavar='FILE',
+                        help='draw note, chord, scale, box and caged views '
+                        'to an SVG file')
     subparsers = parser.add_subparsers(
         title='subcommands',
         description='valid subcommands',
@@ -508,13 +294,17 @@ def main():
     noteParser.add_argument('-w', '--whole', action='store_true',
                             default=False,
                             help='show only whole notes (default False)')
+    noteParser.add_argument('--degrees', type=str, action='store',
+                            metavar='ROOT',
+                            help='label notes by interval above ROOT')
     noteParser.add_argument('notes', type=str, action='store', nargs="*",
                             help='pick notes (default: blank, all notes)')
 
     # subparser for chord
     chordParser = subparsers.add_parser(
         'chord',
-        description='Show all the notes for a chord.',
+        description='Show all the notes for a chord, given as a root and '
+        'a chord type option or as a chord symbol.',
         help='show chords')
     chordParser.add_argument('--minor', '--min', '--m', '-m',
                              action='store_true', default=False,
@@ -530,8 +320,18 @@ def main():
                              default=False, help='show major 7th')
     chordParser.add_argument('--dim', action='store_true', default=False,
                              help='show diminished')
+    chordParser.add_argument('--degrees', action='store_true',
+                             default=False,
+                             help='label notes by interval above the root')
+    chordParser.add_argument('--voicings', '-V', type=int, nargs='?',
+                             const=10, default=0, metavar='N',
+                             help='list the N easiest voicings (default 10)')
+    chordParser.add_argument('--tuning', '-t', type=str, action='store',
+                             help='tuning for --voicings, low string first '
+                             '(default EADGBE)')
     chordParser.add_argument('root', type=str, action='store',
-                             help='chord root')
+                             help='chord root, or a chord symbol such as '
+                             'C#m7b5, Gmaj9#11/B or F/C')
 
     # subparser for pan
     panParser = subparsers.add_parser(
@@ -562,6 +362,9 @@ def main():
     scaleParser.add_argument('--minor', '--min', '-m',
                              action='store_true', default=False,
                              help='show minor (default is major)')
+    scaleParser.add_argument('--degrees', action='store_true',
+                             default=False,
+                             help='label notes by interval above the root')
     scaleParser.add_argument('root', type=str, action='store',
                              help='scale root')
 
@@ -573,6 +376,8 @@ def main():
     boxParser.add_argument('-f', '--form', action='store', type=str,
                            help='show pentatonic box scales: g,e,d,c,a '
                            'or 1-5')
+    boxParser.add_argument('--degrees', action='store_true', default=False,
+                           help='label notes by interval above the root')
     boxParser.add_argument('root', action='store', type=str, nargs="?",
                            help='show all box forms for this key. '
                            '--form args is ignored. '
@@ -586,6 +391,9 @@ def main():
     cagedParser.add_argument('--triads', '--tri', '-t', action='store_true',
                              default=False,
                              help='show triads ')
+    cagedParser.add_argument('--degrees', action='store_true',
+                             default=False,
+                             help='label notes by interval above the root')
     cagedParser.add_argument('root', type=str, action='store',
                              help='scale root')
 
@@ -595,10 +403,131 @@ def main():
         description='Play "Name that Note" game".',
         help='play "name that note" game')
 
+    # subparser for tuning search
+    tuningParser = subparsers.add_parser(
+        'tuning-search',
+        description='Search alternate tunings that make a set of chords '
+        'easy to play.',
+        help='search alternate tunings')
+    tuningParser.add_argument('-r', '--range', type=int, default=2,
+                              help='semitones each string may move from '
+                              'standard (default=2)')
+    tuningParser.add_argument('-n', '--top', type=int, default=10,
+                              help='number of tunings to show (default=10)')
+    tuningParser.add_argument('-j', '--jobs', type=int, default=None,
+                              help='worker processes (default: all cores)')
+    tuningParser.add_argument('-s', '--song', type=str, action='store',
+                              help='file of chord names')
+    tuningParser.add_argument('chords', type=str, action='store', nargs="*",
+                              help='chord names, e.g. C Am F G7')
+
+    # subparser for tab
+    tabParser = subparsers.add_parser(
+        'tab',
+        description='Transcribe a melody to tablature. The melody is a '
+        'list of notes (E4 F#4 G), or files of notes or MIDI files.',
+        help='transcribe melody to tab')
+    tabParser.add_argument('-t', '--tuning', type=str, action='store',
+                           help='tuning, low string first (default EADGBE)')
+    tabParser.add_argument('-w', '--width', type=int, default=76,
+                           help='wrap tab at this width (default=76)')
+    tabParser.add_argument('-j', '--jobs', type=int, default=None,
+                           help='worker processes for files '
+                           '(default: all cores)')
+    tabParser.add_argument('melody', type=str, action='store', nargs="+",
+                           help='notes, or note or MIDI files')
+
+    # subparser for harmonize
+    harmParser = subparsers.add_parser(
+        'harmonize',
+        description='Arrange a melody as chord melody: a voicing of the '
+        'chord under each note, with the note on top. Give a chord per '
+        'note, or a key to choose from its diatonic chords.',
+        help='harmonize a melody with chords')
+    harmParser.add_argument('-c', '--chords', type=str, action='store',
+                            help='chords, one per note, e.g. "C Am F G7"; '
+                            'the last one holds')
+    harmParser.add_argument('-k', '--key', type=str, action='store',
+                            help='key to take diatonic chords from')
+    harmParser.add_argument('--minor', '-m', action='store_true',
+                            default=False,
+                            help='minor key (default is major)')
+    harmParser.add_argument('-t', '--tuning', type=str, action='store',
+                            help='tuning, low string first (default EADGBE)')
+    harmParser.add_argument('-w', '--width', type=int, default=76,
+                            help='wrap tab at this width (default=76)')
+    harmParser.add_argument('melody', type=str, action='store', nargs="+",
+                            help='notes, or a note or MIDI file')
+
+    # subparser for heatmap
+    heatParser = subparsers.add_parser(
+        'heatmap',
+        description='Show which frets are played in a collection of ASCII '
+        'tabs.',
+        help='heatmap of tab files')
+    heatParser.add_argument('-c', '--counts', action='store_true',
+                            default=False,
+                            help='show counts (default: shading)')
+    heatParser.add_argument('-j', '--jobs', type=int, default=None,
+                            help='worker processes (default: all cores)')
+    heatParser.add_argument('tabs', type=str, action='store', nargs="+",
+                            help='tab files or directories')
+
+    # subparser for listen
+    listenParser = subparsers.add_parser(
+        'listen',
+        description='Name the chords played in WAV recordings, with the '
+        'time each starts and ends.',
+        help='chords heard in WAV files')
+    listenParser.add_argument('--frame', type=int, default=8192,
+                              help='samples analyzed at a time '
+                              '(default=8192)')
+    listenParser.add_argument('wavs', type=str, action='store', nargs="+",
+                              help='WAV files')
+
+    # subparser for build-db
+    dbParser = subparsers.add_parser(
+        'build-db',
+        description='Find every voicing of every chord on the common '
+        'tunings and save them for chord --voicings.',
+        help='build the voicing database')
+    dbParser.add_argument('-o', '--output', type=str, default=DefaultPath,
+                          help='database file (default {})'.format(
+                              os.path.basename(DefaultPath)))
+
+    # subparser for sheet
+    sheetParser = subparsers.add_parser(
+        'sheet',
+        description='Draw many diagrams to one SVG file: every chord, '
+        'scale, caged, triad or box shape, or the chords named.',
+        help='draw a sheet of SVG diagrams')
+    sheetParser.add_argument('-o', '--output', type=str,
+                             default='fretboard.svg',
+                             help='SVG file (default fretboard.svg)')
+    sheetParser.add_argument('-c', '--columns', type=int, default=4,
+                             help='diagrams per row (default=4)')
+    sheetParser.add_argument('--degrees', action='store_true',
+                             default=False,
+                             help='label notes by interval above the root')
+    sheetParser.add_argument('items', type=str, action='store', nargs="*",
+                             default=['chords'],
+                             help='chords, scales, caged, triads, boxes '
+                             'or chord symbols (default: chords)')
+
     args = parser.parse_args()
+    if args.svg and (args.sub not in SvgViews or
+                     getattr(args, 'voicings', 0)):
+        parser.error('--svg draws only the {} views'.format(
+            ', '.join(SvgViews)))
+    args.sheet = Sheet() if args.svg else None
 
     sub = args.sub
     if sub == 'note':
+        if args.degrees is not None:
+            try:
+                args.degrees = getNoteIdx(args.degrees)
+            except ValueError:
+                parser.error('unknown note "{}"'.format(args.degrees))
         if args.notes == []:
             # no notes given
             if args.whole:
@@ -614,7 +543,7 @@ def main():
         print('Notes: {}\n'.format(', '.join(args.notes)))
 
         args.frets += 1
-        showNotes(args)
+        showNotes(args, 'Notes: ' + ', '.join(args.notes))
 
     elif sub == 'chord':
         try:
@@ -629,81 +558,74 @@ def main():
             idx = getNoteIdx(scale)
         except ValueError:
             parser.error('unknown note "{}"'.format(args.root))
-        if args.diatonic:
-            adjective = "Diatonic"
-            if args.minor:
-                # minor diatonic scale
-                # Root, +2, +1, +2, +2 +1, +2
-                args.notes = [
-                    Notes[idx],
-                    Notes[(idx + 2) % nNotes],
-                    Notes[(idx + 3) % nNotes],
-                    Notes[(idx + 5) % nNotes],
-                    Notes[(idx + 7) % nNotes],
-                    Notes[(idx + 8) % nNotes],
-                    Notes[(idx + 10) % nNotes],
-                ]
-                adjective = 'Minor ' + adjective
-            else:
-                # major diatonic scale
-                # Root, +2, +2, +1, +2 +2, +2
-                args.notes = [
-                    Notes[idx],
-                    Notes[(idx + 2) % nNotes],
-                    Notes[(idx + 4) % nNotes],
-                    Notes[(idx + 5) % nNotes],
-                    Notes[(idx + 7) % nNotes],
-                    Notes[(idx + 9) % nNotes],
-                    Notes[(idx + 11) % nNotes],
-                ]
-                adjective = 'Major ' + adjective
-        else:
-            adjective = 'Pentatonic'
-            if args.minor:
-                # minor pentatonic scale
-                # Root, +3, +2, +2, +3
-                args.notes = [
-                    Notes[idx],
-                    Notes[(idx + 3) % nNotes],
-                    Notes[(idx + 5) % nNotes],
-                    Notes[(idx + 7) % nNotes],
-                    Notes[(idx + 10) % nNotes],
-                ]
-                adjective = 'Minor ' + adjective
-            else:
-                # major pentatonic scale
-                # Root, +2, +2, +3, +2
-                args.notes = [
-                    Notes[idx],
-                    Notes[(idx + 2) % nNotes],
-                    Notes[(idx + 4) % nNotes],
-                    Notes[(idx + 7) % nNotes],
-                    Notes[(idx + 9) % nNotes],
-                ]
-                adjective = 'Major ' + adjective
+        theScale = scaleNotes(scale, args.minor, args.diatonic)
+        args.notes = theScale.notes
+        adjective = theScale.name
 
         print('{} Scale: {} -- {}\n'.format(
             adjective, scale, ', '.join(args.notes)))
 
+        args.degrees = idx if args.degrees else None
         args.frets += 1
-        showNotes(args)
+        showNotes(args, '{} Scale: {}'.format(adjective, scale))
 
     elif sub == 'box':
         try:
             box(args)
-        except AssertionError as e:
+        except ValueError as e:
             print("ERROR: ", e)
 
     elif sub == 'caged':
         if args.triads:
-            showTriads(args.root.title())
+            showTriads(args.root.title(), args.degrees, args.sheet)
         else:
-            showCaged(args.root.title())
+            showCaged(args.root.title(), args.degrees, args.sheet)
 
     elif sub == 'game':
         playNoteGame(args)
     elif sub == 'pan':
         panorama(args)
+    elif sub == 'tab':
+        try:
+            showTab(args)
+        except ValueError as e:
+            parser.error(e)
+    elif sub == 'harmonize':
+        try:
+            showHarmony(args)
+        except ValueError as e:
+            parser.error(e)
+    elif sub == 'heatmap':
+        # only the heatmap needs numpy
+        from heatmap import showHeatmap
+        try:
+            showHeatmap(args)
+        except OSError as e:
+            parser.error(e)
+    elif sub == 'listen':
+        # like the heatmap, only listening needs numpy
+        from listen import showListen
+        try:
+            showListen(args)
+        except (OSError, EOFError, ValueError, wave.Error) as e:
+            parser.error(e)
+    elif sub == 'build-db':
+        entries, count = buildDb(args.output)
+        print('{} voicings of {} chords in {}'.format(count, entries,
+                                                     args.output))
+    elif sub == 'sheet':
+        try:
+            sheet = librarySheet(args.items, args.degrees, args.columns,
+                                 args.frets + 1)
+        except ValueError as e:
+            parser.error(e)
+        sheet.write(args.output)
+        print('{} diagrams in {}'.format(len(sheet.diagrams), args.output))
+    elif sub == 'tuning-search':
+        try:
+            showTunings(args)
+        except (ValueError, OSError) as e:
+            parser.error(e)
     else:
         if sub:
             print('unknown command: {}'.format(sub))
@@ -711,6 +633,9 @@ def main():
             print('no command given')
         exit(-1)
 
+    if args.sheet is not None and args.sheet.diagrams:
+        args.sheet.write(args.svg)
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,383 @@
+'''
+Fretboard library: notes, chords, scales and shapes on the guitar neck
+returned as data. Nothing here prints; fret.py and scale.py render it.
+
+Grids are lists of rows, one per string, high E first, with one label
+per fret; ' ' is an empty fret.
+'''
+__author__ = "VW Freeh"
+
+from notes import Notes, bNotes, nNotes, getNoteIdx
+from notes import DegreeTable, DegreeNames
+from chords import parseChord
+from tuning import Standard, pitchMatrix
+
+# these are the marks on the guitar neck
+Ticks = ['', '', '*', '', '*', '', '**', '', '*', '', '', '**',
+         '', '', '*', '', '*']
+
+# how the chord view names the qualities in chords.ChordIntervals; other
+# chord symbols are shown as written
+ChordSuffix = {
+    '': 'Maj',
+    'm': 'min',
+    '7': '7',
+    'aug': 'Aug',
+    'maj7': 'Maj7',
+    'm7': 'min7',
+    'dim': 'Dim',
+}
+
+# semitones above the root, by (minor, diatonic)
+ScaleIntervals = {
+    (False, False): (0, 2, 4, 7, 9),                # major pentatonic
+    (True, False): (0, 3, 5, 7, 10),                # minor pentatonic
+    (False, True): (0, 2, 4, 5, 7, 9, 11),          # major diatonic
+    (True, True): (0, 2, 3, 5, 7, 8, 10),           # minor diatonic
+}
+
+# diatonic major is WWHWWWH
+MajorScale = [0, 2, 2, 1, 2, 2, 2, 1]
+# natural minor WHWWHWW
+MinorScale = [0, 2, 1, 2, 2, 1, 2, 2]
+
+# chords on each degree of the scale: numeral, suffix, offset, intervals
+MajorChords = [
+    ('I', '', 0, (0, 4, 7)),
+    ('ii', 'm', 2, (0, 3, 7)),
+    ('iii', 'm', 4, (0, 3, 7)),
+    ('IV', '', 5, (0, 4, 7)),
+    ('V', '', 7, (0, 4, 7)),
+    ('vi', 'm', 9, (0, 3, 7)),
+    ('vii0', 'dim', 11, (0, 3, 6)),
+]
+MinorChords = [
+    ('i', 'm', 0, (0, 3, 7)),
+    ('ii0', 'dim', 2, (0, 3, 6)),
+    ('III', '', 3, (0, 4, 7)),
+    ('iv', 'm', 5, (0, 3, 7)),
+    ('v', 'm', 7, (0, 3, 7)),
+    ('VI', '', 8, (0, 4, 7)),
+    ('VII', '', 10, (0, 4, 7)),
+]
+
+CHROMATIC_NOTES = "C-D-EF-G-A-B"
+# Panorama[n][i] is the note n semitones above CHROMATIC_NOTES[i],
+# for every root at once
+Panorama = [CHROMATIC_NOTES[n:] + CHROMATIC_NOTES[:n] for n in range(nNotes)]
+
+BoxStrings = {}
+BoxStrings['g'] = [
+    ['m', ' ', ' ', 'M', ' '],
+    ['*', ' ', ' ', '*', ' '],
+    ['M', ' ', '*', ' ', ' '],
+    ['*', ' ', 'm', ' ', ' '],
+    ['*', ' ', '*', ' ', ' '],
+    ['m', ' ', ' ', 'M', ' '],
+]
+BoxStrings['e'] = [
+    [' ', 'M', ' ', '*', ' '],
+    [' ', '*', ' ', 'm', ' '],
+    ['*', ' ', '*', ' ', ' '],
+    ['m', ' ', ' ', 'M', ' '],
+    ['*', ' ', ' ', '*', ' '],
+    [' ', 'M', ' ', '*', ' '],
+]
+BoxStrings['d'] = [
+    [' ', '*', ' ', '*', ' '],
+    [' ', 'm', ' ', ' ', 'M'],
+    ['*', ' ', ' ', '*', ' '],
+    [' ', 'M', ' ', '*', ' '],
+    [' ', '*', ' ', 'm', ' '],
+    [' ', '*', ' ', '*', ' '],
+]
+BoxStrings['c'] = [
+    ['*', ' ', ' ', '*', ' '],
+    [' ', 'M', ' ', '*', ' '],
+    ['*', ' ', 'm', ' ', ' '],
+    ['*', ' ', '*', ' ', ' '],
+    ['m', ' ', ' ', 'M', ' '],
+    ['*', ' ', ' ', '*', ' '],
+]
+BoxStrings['a'] = [
+    [' ', '*', ' ', 'm', ' '],
+    [' ', '*', ' ', '*', ' '],
+    ['m', ' ', ' ', 'M', ' '],
+    ['*', ' ', ' ', '*', ' '],
+    [' ', 'M', ' ', '*', ' '],
+    [' ', '*', ' ', 'm', ' '],
+]
+BoxNames = ['g', 'e', 'd', 'c', 'a']
+
+# frets for all boxes
+# offset is
+# E hi
+BoxAll = [
+    ['  ', 'de', '  ', 'dc', '  ', '  ', 'ca', '  ', 'ag', '  ', '  ', 'MM', ],
+    ['  ', 'mm', '  ', '  ', 'M ', '  ', 'ca', '  ', 'ag', '  ', '  ', 'ge', ],
+    ['de', '  ', '  ', 'dc', '  ', 'mm', '  ', '  ', 'MM', '  ', 'ge', '  ', ],
+    ['  ', 'MM', '  ', 'dc', '  ', 'ca', '  ', '  ', 'ag', '  ', 'mm', '  ', ],
+    ['  ', 'de', '  ', 'mm', '  ', '  ', 'MM', '  ', 'ag', '  ', 'ge', '  ', ],
+    ['  ', 'de', '  ', 'dc', '  ', '  ', 'ca', '  ', 'ag', '  ', '  ', 'MM', ],
+]
+
+
+class Board(object):
+    '''labels on the neck, from the open string to fret frets-1'''
+    __slots__ = ('grid', 'frets')
+
+    def __init__(self, grid, frets):
+        self.grid = grid
+        self.frets = frets
+
+
+class Chord(object):
+    '''a chord: root name, quality (the symbol after the root) and notes'''
+    __slots__ = ('root', 'quality', 'notes')
+
+    def __init__(self, root, quality, notes):
+        self.root = root
+        self.quality = quality
+        self.notes = notes
+
+    @property
+    def name(self):
+        return self.root + ChordSuffix.get(self.quality, self.quality)
+
+
+class Scale(object):
+    '''a scale: root name, name (e.g. "Major Pentatonic") and notes'''
+    __slots__ = ('root', 'name', 'notes')
+
+    def __init__(self, root, name, notes):
+        self.root = root
+        self.name = name
+        self.notes = notes
+
+
+class Shapes(object):
+    '''CAGED shapes or triads for a root; each grid cell names the shapes
+    using that fret, positions maps a shape to its fret on the low E'''
+    __slots__ = ('root', 'rootFret', 'positions', 'grid')
+
+    def __init__(self, root, rootFret, positions, grid):
+        self.root = root
+        self.rootFret = rootFret
+        self.positions = positions
+        self.grid = grid
+
+
+class Box(object):
+    '''pentatonic boxes; with a root, grid covers frets 0-15 and each cell
+    names the forms using that fret, otherwise grid is one form over
+    five frets'''
+    __slots__ = ('root', 'form', 'grid')
+
+    def __init__(self, root, form, grid):
+        self.root = root
+        self.form = form
+        self.grid = grid
+
+
+def degreeGrid(grid, root, tuning=Standard):
+    '''grid (starting at the open string) with each marked fret relabeled
+    by its interval above root (index into Notes)'''
+    labels = DegreeTable[root]
+    pitches = pitchMatrix(tuning, max(len(row) for row in grid))
+    return [[labels[p] if cell.strip() else ' '
+             for cell, p in zip(row, strPitches)]
+            for row, strPitches in zip(grid, pitches)]
+
+
+def noteBoard(notes, frets=13, degrees=None, tuning=Standard):
+    '''board showing notes (names from Notes); with degrees, a root index,
+    label them by interval above it'''
+    labels = Notes if degrees is None else DegreeTable[degrees]
+    grid = [[labels[p] if Notes[p] in notes else ' ' for p in pitches]
+            for pitches in pitchMatrix(tuning, frets)]
+    return Board(grid, frets)
+
+
+def chordTones(symbol, quality=''):
+    '''notes of a chord symbol like "C#m7b5" or "F/C", or of a root and
+    a quality from ChordIntervals; the notes run up from the root, a
+    slash bass comes first. raises ValueError if not understood'''
+    root, intervals, bass = parseChord(symbol + quality)
+    notes = tuple(Notes[(root + i) % nNotes] for i in intervals)
+    if bass is not None:
+        notes = (Notes[bass], ) + tuple(n for n in notes if n != Notes[bass])
+    # the root is one letter and a sharp or flat, as in the grammar
+    split = 2 if symbol[1:2] in ('#', 'b') else 1
+    return Chord(symbol[:split].title(), symbol[split:] + quality, notes)
+
+
+def chordPanorama(intervals):
+    '''(interval name, note above each root of CHROMATIC_NOTES) for each
+    interval of a chord'''
+    return [(DegreeNames[n], Panorama[n]) for n in intervals]
+
+
+def scaleNotes(root, minor=False, diatonic=False):
+    '''notes of a pentatonic (default) or diatonic scale'''
+    root = root.title()
+    idx = getNoteIdx(root)
+    name = '{} {}'.format('Minor' if minor else 'Major',
+                          'Diatonic' if diatonic else 'Pentatonic')
+    return Scale(root, name,
+                 [Notes[(idx + i) % nNotes]
+                  for i in ScaleIntervals[minor, diatonic]])
+
+
+def _noteNames(root):
+    if len(root) > 1 and root[1].lower() == 'b':
+        return bNotes
+    return Notes
+
+
+def scaleDegrees(root, minor=False):
+    '''(steps from the previous degree, note) for the eight degrees of a
+    diatonic scale, spelled with flats in flat keys'''
+    if root.lower() == 'f':
+        names = bNotes
+    else:
+        names = _noteNames(root)
+    note = getNoteIdx(root)
+    degrees = []
+    for skip in MinorScale if minor else MajorScale:
+        note = (note + skip) % nNotes
+        degrees.append((skip, names[note]))
+    return degrees
+
+
+def diatonicChords(root, minor=False):
+    '''(notes of the scale, chords) for a key; each chord is (numeral,
+    name, notes)'''
+    names = _noteNames(root)
+    rootIdx = getNoteIdx(root)
+    x = rootIdx
+    notes = []
+    for step in (MinorScale if minor else MajorScale)[1:]:
+        notes.append(names[x % nNotes])
+        x += step
+
+    chords = []
+    for (numeral, suffix, offset, intervals), note in zip(
+            MinorChords if minor else MajorChords, notes):
+        chords.append((numeral, note + suffix,
+                       [names[(rootIdx + offset + i) % nNotes]
+                        for i in intervals]))
+    return notes, chords
+
+
+def triads(root_name):
+    '''triad shapes for a root (a name in Notes)'''
+    root = (Notes.index(root_name) + 5) % 12  # set for the lo E string
+    a = (root + 9) % 12
+    e = (root + 1) % 12
+    d = (root + 4) % 12
+    if a < 2:
+        a += 12
+    if e == 0:
+        e = 12
+    if d == 0:
+        d = 12
+    frets = max(12, a+3, e+1, d+3) + 1
+
+    grid = [[' '] * frets for i in range(6)]
+    # E (hi)
+    grid[0][a-2] = "A"
+    grid[0][a+3] = "G"
+    grid[0][d] = "D"
+    # B
+    grid[1][a] = "AG"
+    grid[1][d+1] = "DC"
+    # G
+    grid[2][a] = "AG"
+    grid[2][e] = "E"
+    grid[2][d] = "DC"
+    # D
+    grid[3][a] = "AG"
+    grid[3][e+1] = "ED"
+    grid[3][d+2] = "C"
+    # A
+    grid[4][a-2] = "A"
+    grid[4][a+2] = "G"
+    grid[4][e+1] = "E"
+    grid[4][d+3] = "C"
+    # E (lo)
+    grid[5][a+3] = "G"
+    return Shapes(root_name, root, {'A': a, 'E': e, 'D': d}, grid)
+
+
+def caged(root_name):
+    '''CAGED shapes for a root (a name in Notes)'''
+    root = (Notes.index(root_name) + 5) % 12  # set for the lo E string
+    c = (root + 4) % 12
+    a = (root + 7) % 12
+    g = (root + 9) % 12
+    e = (root) % 12
+    d = (root + 2) % 12
+    frets = max(12, c+3, a+2, g+3, e+2, d+3) + 1
+
+    # (shape, fret) marks on each string; a fret holds at most two shapes
+    marks = [
+        [('C', c), ('A', a), ('G', g+3), ('E', e), ('D', d+2)],   # E (hi)
+        [('C', c+1), ('A', a+2), ('G', g), ('E', e), ('D', d+3)],  # B
+        [('C', c), ('A', a+2), ('G', g), ('E', e+1), ('D', d+2)],  # G
+        [('C', c+2), ('A', a+2), ('G', g), ('E', e+2), ('D', d)],  # D
+        [('C', c+3), ('A', a), ('G', g+2), ('E', e+2)],            # A
+        [('G', g+3), ('E', e)],                                    # E (lo)
+    ]
+    grid = []
+    for string in marks:
+        row = [' '] * frets
+        for shape, fret in string:
+            row[fret] = shape if row[fret] == ' ' else row[fret] + shape
+        grid.append(row)
+    return Shapes(root_name, root,
+                  {'C': c, 'A': a, 'G': g, 'E': e, 'D': d}, grid)
+
+
+def boxes(root):
+    '''all pentatonic box forms for a key, frets 0 to 15; raises
+    ValueError for an unknown root'''
+    frets = 15
+    try:
+        shift = 12 - (Notes.index(root.upper()) + 5) % 12
+    except ValueError:
+        raise ValueError('invalid note "{}"'.format(root))
+
+    grid = []
+    for i in range(6):
+        # set for the lo E string
+        string = BoxAll[i][shift:] + BoxAll[i][:shift]
+        string += string[:frets - nNotes]
+        grid.append([string[nNotes - 1]] + string)
+    return Box(root.upper(), None, grid)
+
+
+def boxForm(form):
+    '''one pentatonic box form, by name (g, e, d, c, a) or number (1-5);
+    raises ValueError for an unknown form'''
+    form = form.lower()
+    try:
+        form = BoxNames[int(form)-1]
+    except IndexError:
+        raise ValueError('unknown box form')
+    except ValueError:
+        pass
+    try:
+        return Box(None, form, BoxStrings[form])
+    except KeyError:
+        raise ValueError('unknown box form')
+
+
+def boxFormDegrees(box):
+    '''grid of a box form labeled by interval above its major root'''
+    strings = box.grid
+    s, f = next((s, string.index('M'))
+                for s, string in enumerate(strings) if 'M' in string)
+    labels = DegreeTable[(Standard[s] + f) % nNotes]
+    return [[labels[(Standard[s] + f) % nNotes] if note != ' ' else note
+             for f, note in enumerate(string)]
+            for s, string in enumerate(strings)]
@@ -0,0 +1,253 @@
+#!/usr/bin/python3
+'''
+"Name that note" server: the note game for a whole class at once.
+
+One asyncio process hosts every player over a line protocol (telnet or
+nc will do). The boards and answers for every string and fret are built
+once and shared by all sessions; each session keeps its own score and
+answer times. The load subcommand plays many simulated students against
+a server.
+'''
+__author__ = "VW Freeh"
+
+import argparse
+import asyncio
+import random
+import time
+
+from notes import Notes, nextNote, getNoteIdx
+from fret import Roots, gameBoard
+
+Prompt = b'Name that note '
+# tries at each note before the answer is given
+Tries = 3
+
+
+def questionTable(frets):
+    '''(board, answer index) for every string and fret, boards already
+    encoded for the wire'''
+    table = []
+    for fret in range(frets + 1):
+        for string in range(6):
+            board = '\r\n'.join(gameBoard(string, fret, frets)) + '\r\n'
+            table.append((board.encode(),
+                          Notes.index(nextNote(Roots[string], fret))))
+    return table
+
+
+class Session(object):
+    '''score and answer times of one player'''
+    __slots__ = ('name', 'count', 'correct', 'answers', 'latency',
+                 'slowest')
+
+    def __init__(self, name):
+        self.name = name
+        self.count = 0          # notes asked
+        self.correct = 0        # notes named
+        self.answers = 0        # guesses, right or wrong
+        self.latency = 0.0      # total seconds from prompt to guess
+        self.slowest = 0.0
+
+    def answered(self, seconds):
+        self.answers += 1
+        self.latency += seconds
+        self.slowest = max(self.slowest, seconds)
+
+    def summary(self):
+        if not self.count:
+            return '{}: no notes'.format(self.name)
+        return ('{}: {:.1f}% {} correct out of {}, '
+                '{:.2f}s per answer, slowest {:.2f}s').format(
+                    self.name, self.correct/self.count*100, self.correct,
+                    self.count, self.latency/max(self.answers, 1),
+                    self.slowest)
+
+
+class GameServer(object):
+    '''the sessions of one server, all asking from the same table'''
+
+    def __init__(self, frets):
+        self.table = questionTable(frets)
+        self.sessions = {}
+        # finished sessions are folded into these totals
+        self.finished = 0
+        self.totals = Session('finished')
+
+    async def play(self, reader, writer):
+        peer = writer.get_extra_info('peername')
+        session = Session('{}:{}'.format(*peer[:2]) if peer else '?')
+        self.sessions[id(session)] = session
+        writer.write(b'Name that note! Answer with a note name, '
+                     b'"quit" to stop.\r\n')
+        try:
+            while await self.ask(session, reader, writer):
+                pass
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            del self.sessions[id(session)]
+            self.finish(session)
+            try:
+                writer.write('\r\nStatistics: {}\r\n'.format(
+                    session.summary()).encode())
+                await writer.drain()
+                writer.close()
+            except ConnectionError:
+                pass
+
+    async def ask(self, session, reader, writer):
+        '''ask one note; False when the player leaves'''
+        board, answer = random.choice(self.table)
+        writer.write(board)
+        for i in range(Tries):
+            writer.write(Prompt)
+            await writer.drain()
+            start = time.monotonic()
+            line = await reader.readline()
+            if not line:
+                return False
+            guess = line.decode(errors='replace').strip()
+            if guess.lower() in ('quit', 'q'):
+                return False
+            session.answered(time.monotonic() - start)
+            try:
+                idx = getNoteIdx(guess)
+            except ValueError:
+                writer.write('unknown note "{}"\r\n'.format(guess).encode())
+                continue
+            if idx == answer:
+                writer.write(b'correct\r\n')
+                session.correct += 1
+                break
+            writer.write(b'incorrect\r\n')
+        else:
+            writer.write('the correct note is  {}\r\n'.format(
+                Notes[answer]).encode())
+        session.count += 1
+        return True
+
+    def finish(self, session):
+        '''add a finished session to the totals'''
+        totals = self.totals
+        self.finished += 1
+        totals.count += session.count
+        totals.correct += session.correct
+        totals.answers += session.answers
+        totals.latency += session.latency
+        totals.slowest = max(totals.slowest, session.slowest)
+
+    def summary(self):
+        sessions = [self.totals] + list(self.sessions.values())
+        count = sum(s.count for s in sessions)
+        correct = sum(s.correct for s in sessions)
+        answers = sum(s.answers for s in sessions)
+        latency = sum(s.latency for s in sessions)
+        return ('{} players, {} notes, {} correct, '
+                '{:.3f}s per answer').format(
+                    self.finished + len(self.sessions), count, correct,
+                    latency/max(answers, 1))
+
+
+async def serve(args):
+    game = GameServer(args.frets)
+    server = await asyncio.start_server(game.play, args.host, args.port)
+    print('serving on {}:{}'.format(args.host, args.port))
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        print(game.summary())
+
+
+async def player(args, answers, stats):
+    '''one simulated student: answer args.questions notes, right with
+    probability args.skill'''
+    reader, writer = await asyncio.open_connection(args.host, args.port)
+    await reader.readline()
+    for i in range(args.questions):
+        data = await reader.readuntil(Prompt)
+        board = data[data.index(b' 0 ||'):-len(Prompt)]
+        if random.random() < args.skill:
+            guess = answers[board]
+        else:
+            guess = random.choice(Notes)
+        start = time.monotonic()
+        writer.write(guess.encode() + b'\r\n')
+        await writer.drain()
+        reply = await reader.readline()
+        stats.append(time.monotonic() - start)
+        if reply.startswith(b'incorrect'):
+            # give up on this note
+            for j in range(Tries - 1):
+                await reader.readuntil(Prompt)
+                writer.write(b'x\r\n')
+    writer.write(b'quit\r\n')
+    await writer.drain()
+    await reader.read()
+    writer.close()
+
+
+async def load(args):
+    '''run args.players simulated students at once and report the reply
+    times they saw'''
+    answers = {board: Notes[answer]
+               for board, answer in questionTable(args.frets)}
+    stats = []
+    start = time.monotonic()
+    await asyncio.gather(*[player(args, answers, stats)
+                           for i in range(args.players)])
+    elapsed = time.monotonic() - start
+    stats.sort()
+    print('{} players, {} answers in {:.2f}s ({:.0f}/s)'.format(
+        args.players, len(stats), elapsed, len(stats)/max(elapsed, 1e-9)))
+    if not stats:
+        return
+    print('reply time: median {:.1f}ms, 99% {:.1f}ms, max {:.1f}ms'.format(
+        stats[len(stats)//2]*1000, stats[len(stats)*99//100]*1000,
+        stats[-1]*1000))
+
+
+def main():
+    '''
+    Serve the "Name that note" game to many players, or load test a server.
+    '''
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('-f', '--frets', type=int, default=12,
+                        help='select number of frets (default=12)')
+    parser.add_argument('--host', type=str, default='localhost',
+                        help='address (default=localhost)')
+    parser.add_argument('-p', '--port', type=int, default=4000,
+                        help='port (default=4000)')
+    subparsers = parser.add_subparsers(
+        title='subcommands',
+        description='valid subcommands',
+        dest='sub', )
+    subparsers.required = True
+
+    subparsers.add_parser('serve', description='Run the game server.',
+                          help='run the game server')
+
+    loadParser = subparsers.add_parser(
+        'load',
+        description='Play simulated students against a server.',
+        help='load test a server')
+    loadParser.add_argument('-n', '--players', type=int, default=200,
+                            help='simulated players (default=200)')
+    loadParser.add_argument('-q', '--questions', type=int, default=20,
+                            help='notes per player (default=20)')
+    loadParser.add_argument('-s', '--skill', type=float, default=0.8,
+                            help='chance of a right answer (default=0.8)')
+
+    args = parser.parse_args()
+
+    try:
+        if args.sub == 'serve':
+            asyncio.run(serve(args))
+        else:
+            asyncio.run(load(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+#!/usr/bin/python3
+'''
+Harmonize: chord-melody arrangement of a melody.
+
+Every melody note is a beat with a chord, given or chosen from the
+diatonic chords of a key. The candidates for a beat are the voicings
+with the melody note on the highest sounding string and chord tones
+under it within a hand span; they are found once per (chord, melody
+pitch) and cached, and only the easiest are kept. A Viterbi search over
+the beats, as for tab, picks the candidates that move the hand least.
+'''
+__author__ = "VW Freeh"
+
+import os
+from functools import lru_cache
+
+from notes import Notes, nNotes, getNoteIdx
+from chords import chordMask, parseChord
+from fretboard import diatonicChords
+from tuning import Standard, nStrings, HandSpan, parseTuning, voicingCost
+from tab import parsePitch, readNotes, readMidi, positions
+
+# fewest notes in a chord voicing, melody included
+MinNotes = 3
+# candidates kept per beat, easiest first
+Beam = 12
+
+
+def melodyPitches(melody):
+    '''pitches of a list of notes, or of one note or MIDI file'''
+    if len(melody) == 1 and os.path.isfile(melody[0]):
+        path = melody[0]
+        if path.lower().endswith(('.mid', '.midi')):
+            return readMidi(path)
+        with open(path) as f:
+            return list(readNotes(f))
+    pitches, pitch = [], None
+    for name in melody:
+        pitch = parsePitch(name, pitch)
+        pitches.append(pitch)
+    return pitches
+
+
+def chordTable(symbol):
+    '''(name, mask, optional mask) for a chord symbol; the fifth may be
+    left out of a voicing'''
+    root, intervals, bass = parseChord(symbol)
+    mask = chordMask(root, intervals)
+    if bass is not None:
+        mask |= 1 << bass
+    optional = chordMask(root, (7, )) if 7 in intervals else 0
+    return symbol, mask, optional
+
+
+def keyChords(key, minor=False):
+    '''chordTable of each diatonic chord of a key'''
+    notes, chords = diatonicChords(key, minor)
+    table = []
+    for numeral, name, tones in chords:
+        mask = 0
+        for n in tones:
+            mask |= 1 << getNoteIdx(n)
+        # the diatonic chords are triads; the fifth is the third tone
+        table.append((name, mask, 1 << getNoteIdx(tones[2])))
+    return table
+
+
+@lru_cache(maxsize=None)
+def _candidates(tuning, mask, optional, pitch, frets, span):
+    found = []
+    played = [None] * nStrings
+    # frets on each string that sound a chord tone
+    options = [[f for f in range(frets + 1)
+                if mask >> ((base + f) % nNotes) & 1] for base in tuning]
+
+    def place(s, lo, hi, have, count):
+        if s == nStrings:
+            if count >= MinNotes and (have | optional) & mask == mask:
+                found.append(tuple(played))
+            return
+        place(s + 1, lo, hi, have, count)       # muted
+        for fret in options[s]:
+            if tuning[s] + fret >= pitch:
+                break           # the melody must be on top
+            if fret:
+                nlo, nhi = min(lo, fret), max(hi, fret)
+                if nhi - nlo >= span:
+                    continue
+            else:
+                nlo, nhi = lo, hi
+            played[s] = fret
+            note = 1 << ((tuning[s] + fret) % nNotes)
+            place(s + 1, nlo, nhi, have | note, count + 1)
+        played[s] = None
+
+    # the melody on each string that can play it; higher strings muted
+    for top, fret in positions(pitch, tuning, frets):
+        played[top] = fret
+        lo, hi = (fret, fret) if fret else (frets + 1, -1)
+        place(top + 1, lo, hi, 1 << (pitch % nNotes), 1)
+        played[top] = None
+    found.sort(key=placeCost)
+    return found[:Beam]
+
+
+def candidates(tuning, chord, pitch, frets=12, span=HandSpan):
+    '''easiest voicings of chord (a chordTable entry) with pitch on top,
+    high string first; cached per (chord, pitch)'''
+    name, mask, optional = chord
+    return _candidates(tuple(tuning), mask, optional, pitch, frets, span)
+
+
+def _hand(voicing):
+    '''lowest fretted fret, or None if nothing is fretted'''
+    fretted = [f for f in voicing if f]
+    return min(fretted) if fretted else None
+
+
+def placeCost(voicing):
+    '''cost of a voicing on its own: voicingCost, and high frets'''
+    return voicingCost(voicing) + (_hand(voicing) or 0) // 4
+
+
+@lru_cache(maxsize=1 << 16)
+def chordMove(prev, cur):
+    '''cost of playing voicing cur right after prev: each string that
+    changes, and the hand moving along the neck; the same pairs come up
+    again and again in an arrangement, so results are cached'''
+    cost = sum(1 for a, b in zip(prev, cur) if a != b)
+    pf, f = _hand(prev), _hand(cur)
+    if pf is not None and f is not None:
+        jump = abs(f - pf)
+        cost += 2 * jump if jump < 4 else 6 * jump
+    return cost
+
+
+def harmonize(pitches, chords, tuning=Standard, frets=12):
+    '''(chord name, voicing) for each pitch, minimizing the total cost.
+    chords holds the chordTable choices for each pitch; a pitch with no
+    voicing in any of them is played alone, and pitches out of range of
+    the neck are dropped.'''
+    columns = []
+    for pitch, choices in zip(pitches, chords):
+        column = [(chord[0], v) for chord in choices
+                  for v in candidates(tuning, chord, pitch, frets)]
+        # with several chords to choose from, keep the easiest overall
+        column = sorted(column, key=lambda c: placeCost(c[1]))[:Beam]
+        if not column:
+            for s, fret in positions(pitch, tuning, frets):
+                voicing = [None] * nStrings
+                voicing[s] = fret
+                column.append(('', tuple(voicing)))
+        if column:
+            columns.append(column)
+    if not columns:
+        return []
+
+    # cost[i] is the cheapest way to reach columns[-1][i]
+    cost = [placeCost(v) for name, v in columns[0]]
+    back = []
+    for prev, cur in zip(columns, columns[1:]):
+        step, nxt = [], []
+        for name, voicing in cur:
+            moves = [cost[i] + chordMove(v, voicing)
+                     for i, (n, v) in enumerate(prev)]
+            best = min(range(len(prev)), key=moves.__getitem__)
+            step.append(best)
+            nxt.append(moves[best] + placeCost(voicing))
+        back.append(step)
+        cost = nxt
+
+    # walk the back pointers from the cheapest end
+    i = min(range(len(cost)), key=cost.__getitem__)
+    path = [columns[-1][i]]
+    for step, column in zip(reversed(back), reversed(columns[:-1])):
+        i = step[i]
+        path.append(column[i])
+    return path[::-1]
+
+
+def renderChords(path, tuning=Standard, width=76):
+    '''lines of tablature with the chord names above, high string first,
+    wrapped at width'''
+    names = ['{:2s}|'.format(Notes[p % nNotes]) for p in tuning]
+    names[0] = names[0].lower()
+    lines = []
+    rows = ['   '] + list(names)
+    last = None
+    for name, voicing in path:
+        cells = ['-' if f is None else str(f) for f in voicing]
+        if len(rows[1]) + max(len(c) for c in cells + [name]) + 1 > width:
+            lines.extend(rows + [''])
+            rows = ['   '] + list(names)
+            last = None
+        # a chord is named where it changes
+        label = name if name != last else ''
+        last = name
+        cell = max(len(c) for c in cells + [label]) + 1
+        rows[0] += label.ljust(cell)
+        for i, c in enumerate(cells):
+            rows[i + 1] += c.ljust(cell, '-')
+    lines.extend(rows)
+    return lines
+
+
+def showHarmony(args):
+    '''print a chord-melody arrangement of args.melody'''
+    tuning = parseTuning(args.tuning) if args.tuning else Standard
+    pitches = melodyPitches(args.melody)
+    if args.chords:
+        symbols = args.chords.replace(',', ' ').split()
+        # a chord per note; the last chord holds
+        symbols += symbols[-1:] * (len(pitches) - len(symbols))
+        chords = [[chordTable(s)] for s in symbols]
+    elif args.key:
+        table = keyChords(args.key, args.minor)
+        chords = []
+        for pitch in pitches:
+            # the diatonic chords with the melody note in them
+            chords.append([c for c in table if c[1] >> (pitch % nNotes) & 1])
+    else:
+        raise ValueError('give the chords or the key')
+
+    for line in renderChords(harmonize(pitches, chords, tuning, args.frets),
+                             tuning, args.width):
+        print(line.rstrip())
@@ -0,0 +1,123 @@
+#!/usr/bin/python3
+'''
+Heatmap: which strings and frets a collection of tabs actually uses.
+
+ASCII tabs are read a line at a time; each block of six string lines
+(e|---3---|) gives (string, fret) events, which are counted into a
+strings x frets matrix with numpy.bincount. Files are counted in a
+process pool and their matrices summed.
+'''
+__author__ = "VW Freeh"
+
+import os
+import re
+from array import array
+from multiprocessing import Pool
+
+import numpy as np
+
+from fretboard import Ticks
+
+nStrings = 6
+# frets counted; higher frets are dropped
+MaxFret = 24
+# events buffered before they are added to the counts
+Chunk = 1 << 16
+# light to dark
+Shades = ' .:-=+*#%@'
+
+# a string line: optional name then a bar, e.g. "e|--3--" or "D |-0-"
+StringLine = re.compile(r'^\s*[A-Ga-g]?[#b]?\s*[|:](.*)$')
+Fret = re.compile(r'\d+')
+
+
+def tabEvents(f):
+    '''yield (string, fret) for every fret number in the six-line blocks
+    of a tab, high string first'''
+    block = []
+    for line in f:
+        match = StringLine.match(line)
+        if not match or '-' not in line:
+            block = []
+            continue
+        block.append(match.group(1))
+        if len(block) == nStrings:
+            for string, text in enumerate(block):
+                # stop at the last bar: "|  x2" after it is not a fret
+                end = text.rfind('|')
+                if end >= 0:
+                    text = text[:end]
+                for fret in Fret.findall(text):
+                    yield string, int(fret)
+            block = []
+
+
+def countFile(path):
+    '''strings x (MaxFret+1) matrix of the events in one tab file'''
+    counts = np.zeros(nStrings * (MaxFret + 1), dtype=np.int64)
+    events = array('l')
+    with open(path, errors='replace') as f:
+        for string, fret in tabEvents(f):
+            if fret <= MaxFret:
+                events.append(string * (MaxFret + 1) + fret)
+            if len(events) == Chunk:
+                counts += np.bincount(events, minlength=counts.size)
+                del events[:]
+    if events:
+        counts += np.bincount(events, minlength=counts.size)
+    return counts.reshape(nStrings, MaxFret + 1)
+
+
+def tabFiles(paths):
+    '''the files named, and the files under the directories named'''
+    for path in paths:
+        if os.path.isdir(path):
+            for top, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    yield os.path.join(top, name)
+        else:
+            yield path
+
+
+def countFiles(paths, jobs=None):
+    '''summed matrix of all the tab files under paths'''
+    total = np.zeros((nStrings, MaxFret + 1), dtype=np.int64)
+    files = list(tabFiles(paths))
+    if jobs == 1 or len(files) < 2:
+        for counts in map(countFile, files):
+            total += counts
+        return total, len(files)
+    with Pool(jobs) as pool:
+        for counts in pool.imap_unordered(countFile, files, chunksize=4):
+            total += counts
+    return total, len(files)
+
+
+def showHeatmap(args):
+    '''print the heatmap of the tabs in args.tabs'''
+    total, nFiles = countFiles(args.tabs, args.jobs)
+    frets = min(args.frets, MaxFret) + 1
+    counts = total[:, :frets]
+    peak = counts.max()
+    print('Heatmap -- {} events in {} files\n'.format(total.sum(), nFiles))
+
+    if args.counts:
+        cells = [[str(c) for c in row] for row in counts]
+    elif peak == 0:
+        cells = [['  '] * frets for row in counts]
+    else:
+        # darker shades for busier frets
+        shade = (counts * (len(Shades) - 1) + peak - 1) // peak
+        cells = [[Shades[s] * 2 for s in row] for row in shade]
+    # wide enough for the biggest count
+    width = max(2, len(str(peak))) if args.counts else 2
+    dash = '-' * (width + 2)
+
+    print("|".join([' {:<{}d} '.format(i, width) for i in range(frets)]))
+    print('+'.join([dash]*frets))
+    for row in cells:
+        print("|".join([' {:{}s} '.format(cell, width) for cell in row]))
+    print('+'.join([dash]*frets) + "+")
+    print(' ' * (width + 2) + '|' + '|'.join(
+        [" {:{}s} ".format(tick, width) for tick in Ticks[:frets-1]]))
@@ -0,0 +1,146 @@
+#!/usr/bin/python3
+'''
+Listen: which chords are played in a WAV recording.
+
+The file is read with the wave module a block of frames at a time. Each
+frame is windowed and transformed with numpy's FFT, and the magnitude of
+every bin is added to the pitch class (index into Notes) nearest its
+frequency, giving a 12-bin chroma vector. The chroma is compared with
+the mask of every root and chord quality; the closest chord names the
+frame, and runs of frames with the same chord are printed as one line.
+Memory does not grow with the length of the recording.
+'''
+__author__ = "VW Freeh"
+
+import wave
+from functools import lru_cache
+
+import numpy as np
+
+from notes import Notes, nNotes
+from chords import ChordIntervals, chordMask
+from fretboard import ChordSuffix
+
+# samples per frame; 8192 is about 0.19 s at 44.1 kHz, fine enough to
+# tell semitones apart down to the low A string
+Frame = 8192
+# frames transformed together
+Block = 32
+# frequencies used, Hz: low E on a guitar to well above the 12th fret
+LowFreq = 70.0
+HighFreq = 2000.0
+# frames quieter than this fraction of full scale are silence
+Quiet = 1e-3
+A1 = 55.0
+
+
+@lru_cache(maxsize=None)
+def chromaMatrix(rate, frame):
+    '''FFT bins x pitch classes: 1 where a bin is nearest the class'''
+    freqs = np.fft.rfftfreq(frame, 1.0 / rate)
+    # below where semitones are a bin apart, bins blur neighbouring notes
+    low = max(LowFreq, rate / frame / (2 ** (1.0 / nNotes) - 1))
+    bins = np.nonzero((freqs >= low) & (freqs <= HighFreq))[0]
+    pitch = np.rint(nNotes * np.log2(freqs[bins] / A1)).astype(np.int64)
+    matrix = np.zeros((len(freqs), nNotes))
+    matrix[bins, pitch % nNotes] = 1
+    return matrix
+
+
+@lru_cache(maxsize=1)
+def templates():
+    '''(names, unit template per row) of every root and chord quality'''
+    names, rows = [], []
+    for quality, intervals in ChordIntervals.items():
+        for root in range(nNotes):
+            mask = chordMask(root, intervals)
+            names.append(Notes[root] + ChordSuffix[quality])
+            rows.append([mask >> i & 1 for i in range(nNotes)])
+    rows = np.array(rows, dtype=np.float64)
+    return names, rows / np.linalg.norm(rows, axis=1)[:, None]
+
+
+def _samples(raw, width, channels):
+    '''frames of raw WAV data as mono floats in [-1, 1]'''
+    if width == 1:
+        data = np.frombuffer(raw, dtype=np.uint8).astype(np.float64) - 128
+    elif width in (2, 4):
+        data = np.frombuffer(raw, dtype='<i{}'.format(width))
+        data = data.astype(np.float64)
+    elif width == 3:
+        # 24 bit: put each sample in the top three bytes of an int32
+        padded = np.zeros((len(raw) // 3, 4), dtype=np.uint8)
+        padded[:, 1:] = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3)
+        data = padded.view('<i4').ravel().astype(np.float64)
+        width = 4
+    else:
+        raise ValueError('unsupported sample width {}'.format(width * 8))
+    data /= 1 << (width * 8 - 1)
+    return data.reshape(-1, channels).mean(axis=1)
+
+
+def frameChords(path, frame=Frame):
+    '''yield (start, end, chord name or None) for each frame of a WAV
+    file, in seconds; None for silence. raises ValueError if the frame
+    is too short to tell semitones apart at the file's sample rate'''
+    names, table = templates()
+    window = np.hanning(frame)
+    with wave.open(path, 'rb') as w:
+        rate, width = w.getframerate(), w.getsampwidth()
+        channels = w.getnchannels()
+        chroma = chromaMatrix(rate, frame)
+        if not chroma.any():
+            # no bin is fine enough to tell semitones apart
+            raise ValueError('frame of {} samples is too short for {} Hz '
+                             'audio'.format(frame, rate))
+        start = 0
+        while True:
+            raw = w.readframes(frame * Block)
+            if not raw:
+                break
+            samples = _samples(raw, width, channels)
+            n = len(samples) // frame
+            if n == 0:
+                break       # a partial frame at the end
+            frames = samples[:n * frame].reshape(n, frame)
+            magnitude = np.abs(np.fft.rfft(frames * window, axis=1))
+            energy = magnitude @ chroma
+            best = (energy @ table.T).argmax(axis=1)
+            # quiet frames, and frames with nothing in the bins used
+            loud = np.sqrt((frames ** 2).mean(axis=1)) > Quiet
+            loud &= energy.any(axis=1)
+            for i in range(n):
+                name = names[best[i]] if loud[i] else None
+                yield start / rate, (start + frame) / rate, name
+                start += frame
+
+
+def chordRuns(path, frame=Frame):
+    '''yield (start, end, chord) for each run of frames with one chord'''
+    run = None
+    for begin, end, chord in frameChords(path, frame):
+        if run and run[2] == chord:
+            run[1] = end
+            continue
+        if run:
+            yield tuple(run)
+        run = [begin, end, chord]
+    if run:
+        yield tuple(run)
+
+
+def _clock(seconds):
+    return '{:d}:{:05.2f}'.format(int(seconds // 60), seconds % 60)
+
+
+def showListen(args):
+    '''print the chords heard in each of args.wavs'''
+    if args.frame < 256:
+        raise ValueError('frame of {} samples is too short'.format(
+            args.frame))
+    for path in args.wavs:
+        print('Listen: {}\n'.format(path))
+        for begin, end, chord in chordRuns(path, args.frame):
+            print('{:>9s} {:>9s}  {}'.format(_clock(begin), _clock(end),
+                                             chord or '-'))
+        print()
@@ -17,12 +17,13 @@ def getNoteIdx(note):
         return bNotes.index(note)
 
 
-def getNotes(pnotes, offset, frets):
-    notes = []
-    for i in range(frets):
-        note = Notes[(i+offset) % nNotes]
-        if note in pnotes:
-            notes.append(note)
-        else:
-            notes.append(' ')
-    return notes
+# interval above the root, by semitone: short labels for the fretboard
+# and long names for the panorama
+Degrees = ['1', 'b2', '2', 'b3', '3', '4', 'b5', '5', '#5', '6', 'b7', '7']
+DegreeNames = ['ROOT', 'b SECOND', 'SECOND', 'b THIRD', 'THIRD', 'FOURTH',
+               'dim FIFTH', 'FIFTH', 'aug FIFTH', 'SIXTH', 'b SEVENTH',
+               'SEVENTH']
+
+# DegreeTable[root][note] is the label of note relative to root
+DegreeTable = [[Degrees[(note - root) % nNotes] for note in range(nNotes)]
+               for root in range(nNotes)]
@@ -10,13 +10,7 @@ import logging
 import logging.handlers
 
 
-from notes import Notes, bNotes, nNotes, nextNote, getNoteIdx
-
-
-# diatonic major is WWHWWWH
-MajorScale = [0, 2, 2, 1, 2, 2, 2, 1]
-# natural minor WHWWHWW
-MinorScale = [0, 2, 1, 2, 2, 1, 2, 2]
+from fretboard import scaleDegrees, diatonicChords
 
 
 def showNotes(args):
@@ -24,54 +18,14 @@ def showNotes(args):
     print('Notes in the {}{} scale'.format(args.root,
                                            'm' if args.minor else ''))
 
-    # which notes
-    if len(args.root) > 1 and args.root[1].lower() == 'b':
-        notes = bNotes
-    elif args.root.lower() == 'f':
-        notes = bNotes
-    else:
-        notes = Notes
-
-    if args.pentatonic:
-        assert True, "TBD"
-    elif args.minor:
-        scale = MinorScale
-    else:
-        scale = MajorScale
-
-    note = getNoteIdx(args.root)
-
-    for i, skip in enumerate(scale):
+    for i, (skip, note) in enumerate(scaleDegrees(args.root, args.minor)):
         if args.full and skip > 1:
             print()
-        note = (note + skip) % nNotes
-        print('{} - {}'.format(i+1, notes[note]))
+        print('{} - {}'.format(i+1, note))
 
 
 def showChords(args):
-    def chordNotes(root, notes, seq):
-        n = []
-        for l in seq:
-            n.append(notes[(root + l) % nNotes])
-        return ', '.join(n)
-
-    # which notes
-    if len(args.root) > 1 and args.root[1].lower() == 'b':
-        noteNames = bNotes
-    else:
-        noteNames = Notes
-
-    if args.minor:
-        scale = MinorScale
-    else:
-        scale = MajorScale
-
-    rootIdx = getNoteIdx(args.root)
-    x = rootIdx
-    notes = []
-    for l in scale[1:]:
-        notes.append(noteNames[x % nNotes])
-        x += l
+    notes, chords = diatonicChords(args.root, args.minor)
 
     print('Notes in the {}{} scale: {}'.format(args.root.title(),
                                                'm' if args.minor else '',
@@ -80,38 +34,8 @@ def showChords(args):
 
     # format string: number, name, notes
     fmt = '{:>5s} {:5s} {}'
-    if args.minor:
-        # minor
-        print(fmt.format("i", notes[0]+'m',
-                         chordNotes(rootIdx, noteNames, [0, 3, 7])))
-        print(fmt.format('ii0', notes[1]+'dim',
-                         chordNotes(rootIdx+2, noteNames, [0, 3, 6])))
-        print(fmt.format('III', notes[2],
-                         chordNotes(rootIdx+3, noteNames, [0, 4, 7])))
-        print(fmt.format("iv", notes[3]+'m',
-                         chordNotes(rootIdx+5, noteNames, [0, 3, 7])))
-        print(fmt.format("v", notes[4]+'m',
-                         chordNotes(rootIdx+7, noteNames, [0, 3, 7])))
-        print(fmt.format('VI', notes[5],
-                         chordNotes(rootIdx+8, noteNames, [0, 4, 7])))
-        print(fmt.format('VII', notes[6],
-                         chordNotes(rootIdx+10, noteNames, [0, 4, 7])))
-    else:
-        # major
-        print(fmt.format("I", notes[0],
-                         chordNotes(rootIdx, noteNames, [0, 4, 7])))
-        print(fmt.format('ii', notes[1]+'m',
-                         chordNotes(rootIdx+2, noteNames, [0, 3, 7])))
-        print(fmt.format('iii', notes[2]+'m',
-                         chordNotes(rootIdx+4, noteNames, [0, 3, 7])))
-        print(fmt.format("IV", notes[3],
-                         chordNotes(rootIdx+5, noteNames, [0, 4, 7])))
-        print(fmt.format("V", notes[4],
-                         chordNotes(rootIdx+7, noteNames, [0, 4, 7])))
-        print(fmt.format('vi', notes[5]+'m',
-                         chordNotes(rootIdx+9, noteNames, [0, 3, 7])))
-        print(fmt.format('vii0', notes[6]+'dim',
-                         chordNotes(rootIdx+11, noteNames, [0, 3, 6])))
+    for numeral, name, chord in chords:
+        print(fmt.format(numeral, name, ', '.join(chord)))
 
 
 def main():
@@ -142,6 +66,8 @@ def main():
                         help='show chords (default is notes)')
 
     args = parser.parse_args()
+    if args.pentatonic:
+        parser.error('pentatonic not supported')
 
     logger = logging.getLogger()
     if args.logfile == '-':
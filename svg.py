@@ -0,0 +1,184 @@
+'''
+SVG diagrams of the fretboard views.
+
+The neck of each (tuning, frets, first fret) is drawn once as a <symbol>
+in <defs>; a diagram is a <use> of its neck plus its markers, so a sheet
+of hundreds of diagrams stays small.
+'''
+__author__ = "VW Freeh"
+
+from html import escape
+
+from notes import Notes, nNotes, getNoteIdx
+from fretboard import Ticks, ChordSuffix, ScaleIntervals, BoxNames
+from fretboard import noteBoard, degreeGrid, chordTones, scaleNotes
+from fretboard import caged, triads, boxes, boxForm, boxFormDegrees
+from tuning import Standard, tuningName
+
+# geometry, in px
+FretWidth = 36
+StringGap = 16
+Left = 22               # room for the string names
+Top = 26                # room for the title
+Below = 18              # room for the inlays
+Gap = 16                # between diagrams
+Radius = 7
+
+Style = '''
+    .neck line { stroke: #333; stroke-width: 1; }
+    .neck .nut { stroke-width: 4; }
+    .neck text { font: 10px sans-serif; fill: #555; }
+    .inlay { fill: #bbb; }
+    .dot { fill: #1d4e89; }
+    .mark { font: bold 8px sans-serif; fill: #fff; text-anchor: middle; }
+    .title { font: 12px sans-serif; fill: #000; }
+'''
+
+
+def _neckId(tuning, frets, first):
+    return 'neck-{}-{}-{}'.format(tuningName(tuning).replace('#', 's'),
+                                  frets, first)
+
+
+def neckSymbol(tuning, frets, first=0):
+    '''<symbol> for a neck of frets columns, the first one being fret
+    first; column 0 is the open string when first is 0'''
+    strings = len(tuning)
+    width = Left + frets * FretWidth
+    height = (strings - 1) * StringGap + Below
+    bottom = (strings - 1) * StringGap
+    parts = ['<symbol id="{}" class="neck" overflow="visible">'.format(
+        _neckId(tuning, frets, first))]
+    for s, pitch in enumerate(tuning):
+        y = s * StringGap
+        parts.append('<text x="2" y="{}">{}</text>'.format(
+            y + 4, Notes[pitch % nNotes]))
+        parts.append('<line x1="{}" y1="{}" x2="{}" y2="{}"/>'.format(
+            Left, y, width, y))
+    # with the open string shown, the nut is after column 0
+    for col in range(0 if first else 1, frets + 1):
+        x = Left + col * FretWidth
+        nut = ' class="nut"' if first == 0 and col == 1 else ''
+        parts.append('<line{} x1="{}" y1="0" x2="{}" y2="{}"/>'.format(
+            nut, x, x, bottom))
+    for col in range(frets):
+        fret = first + col
+        if fret == 0 or fret > len(Ticks):
+            continue
+        tick = Ticks[fret - 1]
+        x = Left + col * FretWidth + FretWidth // 2
+        for i in range(len(tick)):
+            dx = (i * 2 - len(tick) + 1) * 4
+            parts.append('<circle class="inlay" cx="{}" cy="{}" r="3"/>'
+                         .format(x + dx, bottom + Below // 2 + 2))
+    parts.append('</symbol>')
+    return '\n'.join(parts), width, height
+
+
+class Sheet(object):
+    '''diagrams laid out in rows, written as one SVG file'''
+
+    def __init__(self, columns=4):
+        self.columns = columns
+        self.necks = {}         # neck id -> (symbol, width, height)
+        self.diagrams = []      # (neck id, title, markers)
+
+    def add(self, title, grid, first=0, tuning=Standard):
+        '''add a diagram of grid: rows of labels, one per string, ' ' for
+        an empty fret'''
+        frets = max(len(row) for row in grid)
+        key = _neckId(tuning, frets, first)
+        if key not in self.necks:
+            self.necks[key] = neckSymbol(tuning, frets, first)
+        markers = [(s, col, label.strip())
+                   for s, row in enumerate(grid)
+                   for col, label in enumerate(row) if label.strip()]
+        self.diagrams.append((key, title, markers))
+
+    def render(self):
+        '''the SVG document'''
+        if not self.diagrams:
+            return ('<svg xmlns="http://www.w3.org/2000/svg" width="0" '
+                    'height="0"/>\n')
+        cellWidth = max(w for s, w, h in self.necks.values()) + Gap
+        cellHeight = max(h for s, w, h in self.necks.values()) + Top + Gap
+        rows = (len(self.diagrams) + self.columns - 1) // self.columns
+        columns = min(self.columns, len(self.diagrams))
+        parts = [
+            '<svg xmlns="http://www.w3.org/2000/svg" '
+            'xmlns:xlink="http://www.w3.org/1999/xlink" '
+            'width="{}" height="{}">'.format(columns * cellWidth + Gap,
+                                            rows * cellHeight + Gap),
+            '<defs><style>{}</style>'.format(Style),
+            '<symbol id="dot" overflow="visible">'
+            '<circle class="dot" r="{}"/></symbol>'.format(Radius),
+        ]
+        parts.extend(symbol for symbol, w, h in self.necks.values())
+        parts.append('</defs>')
+
+        for i, (key, title, markers) in enumerate(self.diagrams):
+            x = Gap + (i % self.columns) * cellWidth
+            y = Gap + (i // self.columns) * cellHeight
+            parts.append('<g transform="translate({},{})">'.format(x, y))
+            parts.append('<text class="title" y="12">{}</text>'.format(
+                escape(title, quote=False)))
+            parts.append('<use xlink:href="#{}" y="{}"/>'.format(key, Top))
+            for s, col, label in markers:
+                cx = Left + col * FretWidth + FretWidth // 2
+                cy = Top + s * StringGap
+                parts.append('<use xlink:href="#dot" x="{}" y="{}"/>'
+                             '<text class="mark" x="{}" y="{}">{}</text>'
+                             .format(cx, cy, cx, cy + 3,
+                                     escape(label, quote=False)))
+            parts.append('</g>')
+        parts.append('</svg>')
+        return '\n'.join(parts) + '\n'
+
+    def write(self, path):
+        with open(path, 'w') as f:
+            f.write(self.render())
+
+
+def librarySheet(items, degrees=False, columns=4, frets=13):
+    '''sheet of whole libraries ("chords", "scales", "caged", "triads",
+    "boxes") and chord symbols'''
+    sheet = Sheet(columns)
+
+    def notes(title, notes, root):
+        sheet.add(title, noteBoard(notes, frets,
+                                   getNoteIdx(root) if degrees else None).grid)
+
+    for item in items:
+        if item == 'chords':
+            for root in Notes:
+                for quality in ChordSuffix:
+                    chord = chordTones(root, quality)
+                    notes(chord.name, chord.notes, root)
+        elif item == 'scales':
+            for root in Notes:
+                for minor, diatonic in ScaleIntervals:
+                    scale = scaleNotes(root, minor, diatonic)
+                    notes('{} {}'.format(root, scale.name), scale.notes, root)
+        elif item in ('caged', 'triads'):
+            for root in Notes:
+                shapes = caged(root) if item == 'caged' else triads(root)
+                grid = shapes.grid
+                if degrees:
+                    grid = degreeGrid(grid, Notes.index(root))
+                sheet.add('{} {}'.format(item.upper() if item == 'caged'
+                                         else 'Triads', root), grid)
+        elif item == 'boxes':
+            for form in BoxNames:
+                box = boxForm(form)
+                grid = boxFormDegrees(box) if degrees else box.grid
+                sheet.add('Pentatonic form {}'.format(form.upper()), grid, 1)
+            for root in Notes:
+                box = boxes(root)
+                grid = box.grid
+                if degrees:
+                    grid = degreeGrid(grid, Notes.index(root))
+                sheet.add('All box scales for {}'.format(root), grid)
+        else:
+            chord = chordTones(item)
+            notes(chord.name, chord.notes, chord.root)
+    return sheet
@@ -0,0 +1,249 @@
+#!/usr/bin/python3
+'''
+Tab: transcribe a melody to guitar tablature.
+
+Pitches are semitones above A1, the same scale as the tunings in
+tuning.py. Each note is placed on a (string, fret) by a Viterbi search
+over all the places it can be played, so the whole line is as easy to
+play as possible.
+'''
+__author__ = "VW Freeh"
+
+import os
+from multiprocessing import Pool
+
+from notes import Notes, nNotes, getNoteIdx
+from tuning import Standard, nStrings, parseTuning
+
+# MIDI note number of pitch 0 (A1)
+MidiA1 = 33
+# index of C in Notes; octaves start at C
+C = Notes.index('C')
+# MIDI channel 10 is drums
+DrumChannel = 9
+
+
+def parsePitch(name, near=None):
+    '''pitch of a note like "E4", "F#3" or "Bb"; a note without an octave
+    is put in the octave nearest to pitch near (default: the 3rd).
+    raises ValueError if not understood'''
+    octave = name.lstrip('ABCDEFGabcdefg#b')
+    try:
+        idx = getNoteIdx(name[:len(name) - len(octave)])
+        octave = int(octave) if octave else None
+    except ValueError:
+        raise ValueError('unknown note "{}"'.format(name))
+    semis = (idx - C) % nNotes            # above C
+    if octave is not None:
+        return 12 * (octave + 1) + semis - MidiA1
+    if near is None:
+        return 12 * 4 + semis - MidiA1    # octave 3
+    # nearest pitch with this name
+    delta = (semis - (near + MidiA1)) % nNotes
+    return near + delta if delta <= nNotes // 2 else near + delta - nNotes
+
+
+def readNotes(f):
+    '''pitches of the notes named in a text file'''
+    pitch = None
+    for line in f:
+        for name in line.split():
+            if name.startswith('#'):
+                break           # comment
+            pitch = parsePitch(name, pitch)
+            yield pitch
+
+
+def _byte(f):
+    '''read one byte of a MIDI file'''
+    byte = f.read(1)
+    if not byte:
+        raise ValueError('truncated MIDI file')
+    return byte[0]
+
+
+def _varLen(f):
+    '''read a MIDI variable length quantity'''
+    value = 0
+    while True:
+        byte = _byte(f)
+        value = (value << 7) | (byte & 0x7f)
+        if not byte & 0x80:
+            return value
+
+
+def _trackNotes(f, end):
+    '''yield (tick, pitch) for the note-ons of one track, reading the
+    file event by event up to offset end'''
+    tick, status = 0, 0
+    while f.tell() < end:
+        tick += _varLen(f)
+        byte = _byte(f)
+        if byte & 0x80:
+            status = byte
+            data = _byte(f) if byte < 0xf0 else None
+        else:
+            data = byte             # running status
+        kind = status & 0xf0
+        if status == 0xff:          # meta event
+            _byte(f)
+            f.seek(_varLen(f), os.SEEK_CUR)
+        elif status in (0xf0, 0xf7):
+            f.seek(_varLen(f), os.SEEK_CUR)
+        elif kind in (0xc0, 0xd0):  # one data byte
+            pass
+        else:
+            velocity = _byte(f)
+            if kind == 0x90 and velocity and status & 0x0f != DrumChannel:
+                yield tick, data - MidiA1
+
+
+def readMidi(path):
+    '''pitches of the melody in a Standard MIDI File: the highest note
+    started at each tick, over all tracks'''
+    onsets = {}
+    with open(path, 'rb') as f:
+        if f.read(4) != b'MThd':
+            raise ValueError('not a MIDI file "{}"'.format(path))
+        size = int.from_bytes(f.read(4), 'big')
+        f.seek(size, os.SEEK_CUR)
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                break
+            size = int.from_bytes(header[4:], 'big')
+            end = f.tell() + size
+            if header[:4] == b'MTrk':
+                for tick, pitch in _trackNotes(f, end):
+                    if pitch > onsets.get(tick, -1):
+                        onsets[tick] = pitch
+            f.seek(end)
+    return [onsets[tick] for tick in sorted(onsets)]
+
+
+def positions(pitch, tuning=Standard, frets=12):
+    '''(string, fret) places a pitch can be played'''
+    return [(s, pitch - base) for s, base in enumerate(tuning)
+            if 0 <= pitch - base <= frets]
+
+
+def moveCost(prev, cur):
+    '''cost of playing cur right after prev; open strings do not move
+    the hand'''
+    (ps, pf), (s, f) = prev, cur
+    cost = abs(s - ps)
+    if pf and f:
+        jump = abs(f - pf)
+        cost += 2 * jump if jump < 4 else 6 * jump
+    return cost
+
+
+def placeCost(place):
+    '''cost of a place on its own: high frets are harder'''
+    return place[1] // 4
+
+
+def transcribe(pitches, tuning=Standard, frets=12):
+    '''(string, fret) for each pitch, minimizing the total cost; pitches
+    out of range of the neck are dropped'''
+    columns = [positions(p, tuning, frets) for p in pitches]
+    columns = [c for c in columns if c]
+    if not columns:
+        return []
+
+    # cost[i] is the cheapest way to reach columns[-1][i]
+    cost = [placeCost(p) for p in columns[0]]
+    back = []
+    for prev, cur in zip(columns, columns[1:]):
+        step, nxt = [], []
+        for place in cur:
+            best = min(range(len(prev)),
+                       key=lambda i: cost[i] + moveCost(prev[i], place))
+            step.append(best)
+            nxt.append(cost[best] + moveCost(prev[best], place) +
+                       placeCost(place))
+        back.append(step)
+        cost = nxt
+
+    # walk the back pointers from the cheapest end
+    i = min(range(len(cost)), key=cost.__getitem__)
+    path = [columns[-1][i]]
+    for step, column in zip(reversed(back), reversed(columns[:-1])):
+        i = step[i]
+        path.append(column[i])
+    return path[::-1]
+
+
+def dropped(pitches, tuning=Standard, frets=12):
+    '''warning for the pitches transcribe leaves out, or None'''
+    out = sum(1 for p in pitches if not positions(p, tuning, frets))
+    if out:
+        return 'WARNING: {} of {} notes out of range of the neck, ' \
+            'left out'.format(out, len(pitches))
+    return None
+
+
+def renderTab(path, tuning=Standard, width=76):
+    '''lines of tablature, high string first, wrapped at width'''
+    names = ['{:2s}|'.format(Notes[p % nNotes]) for p in tuning]
+    names[0] = names[0].lower()
+    lines = []
+    rows = list(names)
+    for s, fret in path:
+        cell = '{}-'.format(fret)
+        if len(rows[0]) + len(cell) > width:
+            lines.extend(rows + [''])
+            rows = list(names)
+        for i in range(nStrings):
+            rows[i] += cell if i == s else '-' * len(cell)
+    lines.extend(rows)
+    return lines
+
+
+def _tabFile(job):
+    path, tuning, frets = job
+    if path.lower().endswith(('.mid', '.midi')):
+        pitches = readMidi(path)
+    else:
+        with open(path) as f:
+            pitches = list(readNotes(f))
+    return path, transcribe(pitches, tuning, frets), dropped(pitches,
+                                                            tuning, frets)
+
+
+def showTab(args):
+    '''print tablature for the notes or files in args.melody'''
+    tuning = parseTuning(args.tuning) if args.tuning else Standard
+    files = [m for m in args.melody if os.path.isfile(m)]
+    if files and len(files) != len(args.melody):
+        raise ValueError('give either notes or files')
+
+    if not files:
+        pitches, pitch = [], None
+        for name in args.melody:
+            pitch = parsePitch(name, pitch)
+            pitches.append(pitch)
+        warning = dropped(pitches, tuning, args.frets)
+        if warning:
+            print(warning)
+        for line in renderTab(transcribe(pitches, tuning, args.frets),
+                              tuning, args.width):
+            print(line)
+        return
+
+    def show(results):
+        for path, tab, warning in results:
+            print('Tab: {}\n'.format(path))
+            if warning:
+                print(warning)
+            for line in renderTab(tab, tuning, args.width):
+                print(line)
+            print()
+
+    jobs = [(path, tuning, args.frets) for path in files]
+    if len(jobs) == 1 or args.jobs == 1:
+        show(map(_tabFile, jobs))
+    else:
+        # one file per worker, printed in the order given
+        with Pool(args.jobs) as pool:
+            show(pool.imap(_tabFile, jobs))
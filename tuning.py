@@ -0,0 +1,348 @@
+#!/usr/bin/python3
+'''
+Tunings: search for alternate tunings that make a set of chords easy.
+
+A tuning is an array of six signed bytes: the pitch of each open string
+in semitones above A1, high string first (the same order as Roots in
+fret.py). pitch % 12 indexes Notes.
+'''
+__author__ = "VW Freeh"
+
+import heapq
+from array import array
+from functools import lru_cache
+from itertools import product
+from multiprocessing import Pool
+
+from notes import Notes, nNotes, getNoteIdx
+from chords import chordMask, parseChord
+
+# E B G D A E
+Standard = array('b', [31, 26, 22, 17, 12, 7])
+nStrings = len(Standard)
+
+# a fretted voicing can cover at most this many frets
+HandSpan = 4
+# fewest strings that must sound in a voicing
+MinStrings = 4
+# cost of a chord that cannot be played at all in a tuning
+Unplayable = 30
+# voicing counts are capped, so a score cannot be bought with sheer numbers
+MaxCount = 10
+
+
+def tuningName(tuning):
+    '''name low string first, e.g. "EADGBE"'''
+    return ''.join(Notes[p % nNotes] for p in reversed(tuning))
+
+
+def _splitTuning(name, count):
+    '''name read as count note names, or None; a letter and a following
+    "#" or "b" are one note only if that leaves count notes, so "eadgbe"
+    is E A D G B E and "EbAbDbGbBbEb" is six flats'''
+    if not name or not count:
+        return None if name or count else []
+    if len(name) > 1 and name[1] in '#b':
+        try:
+            getNoteIdx(name[:2])
+            rest = _splitTuning(name[2:], count - 1)
+            if rest is not None:
+                return [name[:2]] + rest
+        except ValueError:
+            pass
+    if name[0] == '#':
+        return None
+    rest = _splitTuning(name[1:], count - 1)
+    return None if rest is None else [name[:1]] + rest
+
+
+def parseTuning(name):
+    '''tuning from a name like "DADGAD" or "D A D G A D" (low string first,
+    any case); each string is tuned to the pitch nearest to standard.
+    raises ValueError if not understood'''
+    names = name.split()
+    if len(names) == 1:
+        names = _splitTuning(names[0], nStrings) or []
+    if len(names) != nStrings:
+        raise ValueError('tuning needs {} strings "{}"'.format(nStrings,
+                                                             name))
+    tuning = array('b', Standard)
+    for i, n in enumerate(reversed(names)):
+        try:
+            idx = getNoteIdx(n)
+        except ValueError:
+            raise ValueError('unknown note "{}" in tuning "{}"'.format(
+                n, name))
+        delta = (idx - Standard[i]) % nNotes
+        if delta > nNotes // 2:
+            delta -= nNotes
+        tuning[i] = Standard[i] + delta
+    return tuning
+
+
+@lru_cache(maxsize=None)
+def _pitchMatrix(tuning, frets):
+    return tuple(tuple((base + f) % nNotes for f in range(frets))
+                 for base in tuning)
+
+
+def pitchMatrix(tuning, frets):
+    '''note (index into Notes) at each fret of each string, high string
+    first; frets counts the open string'''
+    return _pitchMatrix(tuple(tuning), frets)
+
+
+def voicings(tuning, root, mask, frets=12, span=HandSpan):
+    '''all playable voicings of a chord in a tuning
+
+    A voicing is a tuple of frets, high string first; None is a muted
+    string. Only bass strings may be muted, the lowest sounding note is
+    the root, every chord tone sounds and the fretted notes fit in span.
+    '''
+    found = []
+    played = [None] * nStrings
+    # frets on each string that sound a chord tone
+    options = [[f for f in range(frets + 1)
+                if mask >> ((base + f) % nNotes) & 1] for base in tuning]
+
+    def place(s, lo, hi, have):
+        if s < 0:
+            if have == mask:
+                found.append(tuple(played))
+            return
+        for fret in options[s]:
+            if fret:
+                nlo, nhi = min(lo, fret), max(hi, fret)
+                if nhi - nlo >= span:
+                    continue
+            else:
+                nlo, nhi = lo, hi
+            played[s] = fret
+            place(s - 1, nlo, nhi, have | 1 << ((tuning[s] + fret) % nNotes))
+        played[s] = None
+
+    # the bass string carries the root
+    for bass in range(nStrings - 1, MinStrings - 2, -1):
+        for fret in range(frets + 1):
+            if (tuning[bass] + fret) % nNotes != root:
+                continue
+            played[bass] = fret
+            lo, hi = (fret, fret) if fret else (frets + 1, -1)
+            place(bass - 1, lo, hi, 1 << root)
+            played[bass] = None
+    return found
+
+
+def voicingCost(voicing):
+    '''how hard a voicing is: stretch across the frets, less open strings'''
+    fretted = [f for f in voicing if f]
+    stretch = max(fretted) - min(fretted) + 1 if fretted else 0
+    opens = voicing.count(0)
+    return 3 * stretch + nStrings - opens
+
+
+def chordScore(tuning, root, mask, frets=12):
+    '''(cost, voicing count) of a chord in a tuning'''
+    found = voicings(tuning, root, mask, frets)
+    if not found:
+        return Unplayable, 0
+    return min(voicingCost(v) for v in found), min(len(found), MaxCount)
+
+
+def scoreTuning(tuning, chords, frets=12, bound=None):
+    '''score of a tuning for a list of (root, mask) chords; lower is
+    better. returns None as soon as the cost passes bound'''
+    cost, count = 0, 0
+    for root, mask in chords:
+        c, n = chordScore(tuning, root, mask, frets)
+        cost += c
+        count += n
+        if bound is not None and cost > bound:
+            return None
+    return cost, -count
+
+
+def _extend(states, pitch, string, chord, frets):
+    '''partial voicings of a chord after one more string, tuned to pitch,
+    is added above the strings so far (string counts from the low string)
+
+    A state is (lo fret, hi fret, tones sounded, open strings) and maps to
+    the number of voicings reaching it, capped at MaxCount. The same
+    states are reached by many voicings, so a string costs the same
+    however many voicings there are below it.
+    '''
+    root, mask = chord
+    new = {}
+    options = [f for f in range(frets + 1)
+               if mask >> ((pitch + f) % nNotes) & 1]
+    for (lo, hi, have, opens), n in states.items():
+        for fret in options:
+            if fret:
+                nlo, nhi = min(lo, fret), max(hi, fret)
+                if nhi - nlo >= HandSpan:
+                    continue
+            else:
+                nlo, nhi = lo, hi
+            key = (nlo, nhi, have | 1 << ((pitch + fret) % nNotes),
+                   opens + (fret == 0))
+            new[key] = min(new.get(key, 0) + n, MaxCount)
+    # this string as the bass, with the strings below it muted
+    if string <= nStrings - MinStrings:
+        for fret in options:
+            if (pitch + fret) % nNotes == root:
+                lo, hi = (fret, fret) if fret else (frets + 1, -1)
+                key = (lo, hi, 1 << root, int(fret == 0))
+                new[key] = min(new.get(key, 0) + 1, MaxCount)
+    return new
+
+
+def _stateCost(lo, hi, opens):
+    return 3 * (hi - lo + 1 if hi >= 0 else 0) + nStrings - opens
+
+
+def _stateBound(states, chord, fixed):
+    '''lowest cost the chord can have once the strings above the fixed
+    ones are tuned: they are taken to be open and to sound whichever
+    chord tones are missing, so no tuning can do better'''
+    root, mask = chord
+    free = nStrings - fixed
+    best = Unplayable
+    for (lo, hi, have, opens) in states:
+        if bin(mask & ~have).count('1') <= free:
+            best = min(best, _stateCost(lo, hi, opens) - free)
+    # the bass on a free string, the fixed strings muted
+    for bass in range(fixed, nStrings - MinStrings + 1):
+        if bin(mask).count('1') <= nStrings - bass:
+            best = min(best, bass)
+            break
+    return best
+
+
+def _stateScore(states, chord):
+    '''(cost, voicing count) of a chord from its states on all strings'''
+    root, mask = chord
+    cost, count = Unplayable, 0
+    for (lo, hi, have, opens), n in states.items():
+        if have == mask:
+            cost = min(cost, _stateCost(lo, hi, opens))
+            count += n
+    return cost, min(count, MaxCount)
+
+
+def _searchBranch(job):
+    '''best tunings with the bass string fixed'''
+    bass, chords, spread, frets, top, cutoff = job
+    best = []                   # heap of (-cost, count, tuning)
+    # nearest standard first, so good tunings are kept early
+    deltas = sorted(range(-spread, spread + 1), key=abs)
+
+    def descend(tuning, states):
+        limit = min(cutoff, -best[0][0]) if len(best) == top else cutoff
+        s = nStrings - len(tuning) - 1
+        if s < 0:
+            cost, count = 0, 0
+            for chord, st in zip(chords, states):
+                c, n = _stateScore(st, chord)
+                cost += c
+                count += n
+                if cost > limit:
+                    return
+            item = (-cost, count, tuning[::-1])
+            if len(best) < top:
+                heapq.heappush(best, item)
+            elif item > best[0]:
+                heapq.heapreplace(best, item)
+            return
+        # cut the subtree if no tuning in it can make the list
+        low = 0
+        for chord, st in zip(chords, states):
+            low += _stateBound(st, chord, len(tuning))
+            if low > limit:
+                return
+        for delta in deltas:
+            pitch = Standard[s] + delta
+            # strings stay in order, high string highest
+            if pitch <= tuning[-1]:
+                continue
+            descend(tuning + (pitch, ),
+                    [_extend(st, pitch, len(tuning), chord, frets)
+                     for chord, st in zip(chords, states)])
+
+    descend((bass, ), [_extend({}, bass, 0, chord, frets)
+                       for chord in chords])
+    return [(-c, -n, t) for c, n, t in best]
+
+
+def searchTunings(chords, spread=2, frets=12, top=10, jobs=None):
+    '''tunings within spread semitones of standard, best first
+
+    Returns a list of (cost, -count, tuning). The search is split by the
+    bass string and the branches run in a process pool. Each branch is a
+    branch and bound: tunings are built from the bass up, carrying the
+    partial voicings of every chord, and a subtree is cut as soon as the
+    least its chords can cost passes the worst of the best top.
+    '''
+    # expensive chords first so the bound cuts early
+    chords = sorted(chords,
+                    key=lambda c: -chordScore(Standard, c[0], c[1], frets)[0])
+
+    # standard and every single string retuned: when there are top of
+    # them, the best top found cannot be worse than the worst of these
+    seeds = [Standard]
+    for s, delta in product(range(nStrings), range(-spread, spread + 1)):
+        tuning = array('b', Standard)
+        tuning[s] += delta
+        if delta and all(a > b for a, b in zip(tuning, tuning[1:])):
+            seeds.append(tuning)
+    scores = sorted(scoreTuning(t, chords, frets)[0] for t in seeds)
+    cutoff = scores[top - 1] if len(scores) >= top else Unplayable * len(
+        chords)
+
+    branches = [(Standard[-1] + delta, chords, spread, frets, top, cutoff)
+                for delta in range(-spread, spread + 1)]
+
+    if jobs == 1:
+        results = list(map(_searchBranch, branches))
+    else:
+        with Pool(jobs) as pool:
+            results = pool.map(_searchBranch, branches)
+    return heapq.nsmallest(top, (r for res in results for r in res))
+
+
+def showTunings(args):
+    '''print the best tunings for the chords in args'''
+    if args.top < 1:
+        raise ValueError('--top must be at least 1')
+    if args.range < 0:
+        raise ValueError('--range must not be negative')
+    names = list(args.chords)
+    if args.song:
+        with open(args.song) as f:
+            for line in f:
+                names.extend(line.split())
+    if not names:
+        raise ValueError('no chords given')
+
+    # each distinct chord once
+    chords = []
+    for name in names:
+        root, intervals, bass = parseChord(name)
+        mask = chordMask(root, intervals)
+        if bass is not None:
+            # a slash chord has its bass note at the bottom
+            root, mask = bass, mask | 1 << bass
+        chord = (root, mask)
+        if chord not in chords:
+            chords.append(chord)
+
+    print('Tunings within {} semitones of standard for: {}\n'.format(
+        args.range, ', '.join(dict.fromkeys(names))))
+    fmt = '{:>4s}  {:12s} {:24s} {:>5s} {:>8s}'
+    print(fmt.format('rank', 'tuning', 'offsets', 'cost', 'voicings'))
+    best = searchTunings(chords, args.range, args.frets, args.top, args.jobs)
+    for i, (cost, count, tuning) in enumerate(best):
+        offsets = ' '.join('{:+d}'.format(p - s)
+                           for p, s in zip(reversed(tuning),
+                                           reversed(Standard)))
+        print(fmt.format(str(i + 1), tuningName(tuning), offsets,
+                         str(cost), str(-count)))
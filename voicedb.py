@@ -0,0 +1,157 @@
+'''
+Voicing database: every voicing of every chord on the common tunings,
+found once by build-db and read back through mmap.
+
+File layout (little endian):
+    magic       8 bytes  b'FRETVDB1'
+    tunings     uint32   number of tunings
+    entries     uint32   number of index entries
+    tunings     6 signed bytes per tuning, high string first
+    index       (key, first voicing, count) uint32 each, sorted by key;
+                key = tuning << 16 | bass << 12 | chord mask
+    voicings    6 bytes each, high string first, 255 for a muted string
+'''
+__author__ = "VW Freeh"
+
+import mmap
+import os
+import struct
+from array import array
+
+from notes import Notes
+from chords import chordMask, parseChord
+from tuning import Standard, nStrings, parseTuning, voicings, voicingCost
+
+Magic = b'FRETVDB1'
+Header = struct.Struct('<8sII')
+Entry = struct.Struct('<III')
+Muted = 255
+# frets searched for the database
+DbFrets = 12
+
+DefaultPath = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           'voicings.db')
+
+# tunings in the database, low string first
+CommonTunings = ['EADGBE', 'DADGBE', 'D#G#C#F#A#D#', 'DADGAD', 'DGDGBD',
+                 'DADF#AD']
+# chord qualities in the database, as written after the root
+Qualities = ['', 'm', '7', 'maj7', 'm7', 'aug', 'dim', 'dim7', 'm7b5',
+             'sus2', 'sus4', '7sus4', '6', 'm6', '9', 'add9', '5']
+
+
+def chordKey(symbol):
+    '''(bass, mask) of a chord symbol; a slash bass is added to the chord'''
+    root, intervals, bass = parseChord(symbol)
+    mask = chordMask(root, intervals)
+    if bass is None:
+        return root, mask
+    return bass, mask | 1 << bass
+
+
+def searchVoicings(tuning, bass, mask, frets=DbFrets):
+    '''voicings of a chord, easiest first'''
+    return sorted(voicings(tuning, bass, mask, frets), key=voicingCost)
+
+
+def buildDb(path=DefaultPath, tunings=CommonTunings, qualities=Qualities):
+    '''search every root and quality on each tuning and write the file;
+    returns (index entries, voicings)'''
+    tunings = [parseTuning(name) for name in tunings]
+    entries, data = {}, array('B')
+    for t, tuning in enumerate(tunings):
+        for root in Notes:
+            for quality in qualities:
+                bass, mask = chordKey(root + quality)
+                key = t << 16 | bass << 12 | mask
+                if key in entries:
+                    continue
+                found = searchVoicings(tuning, bass, mask)
+                entries[key] = (len(data) // nStrings, len(found))
+                for voicing in found:
+                    data.extend(Muted if f is None else f for f in voicing)
+
+    with open(path, 'wb') as f:
+        f.write(Header.pack(Magic, len(tunings), len(entries)))
+        for tuning in tunings:
+            f.write(tuning.tobytes())
+        for key in sorted(entries):
+            f.write(Entry.pack(key, *entries[key]))
+        data.tofile(f)
+    return len(entries), len(data) // nStrings
+
+
+class VoicingDb(object):
+    '''a database file mapped into memory; lookups read it in place'''
+
+    def __init__(self, path=DefaultPath):
+        with open(path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.nTunings, self.nEntries = Header.unpack_from(self.map)
+        if magic != Magic:
+            raise ValueError('not a voicing database "{}"'.format(path))
+        self.index = Header.size + self.nTunings * nStrings
+        self.data = self.index + self.nEntries * Entry.size
+
+    def close(self):
+        self.map.close()
+
+    def tuningId(self, tuning):
+        '''index of a tuning in the file, or None'''
+        want = bytes(array('b', tuning))
+        for t in range(self.nTunings):
+            start = Header.size + t * nStrings
+            if self.map[start:start + nStrings] == want:
+                return t
+        return None
+
+    def entry(self, i):
+        '''(key, first voicing, count) of index entry i'''
+        return Entry.unpack_from(self.map, self.index + i * Entry.size)
+
+    def lookup(self, tuning, bass, mask):
+        '''voicings of a chord, easiest first, or None if the tuning or
+        chord is not in the file'''
+        t = self.tuningId(tuning)
+        if t is None:
+            return None
+        key = t << 16 | bass << 12 | mask
+        # binary search of the index
+        lo, hi = 0, self.nEntries
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.entry(mid)[0] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == self.nEntries or self.entry(lo)[0] != key:
+            return None
+        found, first, count = self.entry(lo)
+        start = self.data + first * nStrings
+        raw = self.map[start:start + count * nStrings]
+        return [tuple(None if f == Muted else f
+                      for f in raw[i:i + nStrings])
+                for i in range(0, len(raw), nStrings)]
+
+
+def chordVoicings(symbol, tuning=Standard, frets=DbFrets, path=DefaultPath):
+    '''voicings of a chord symbol, easiest first: from the database when
+    it has them, otherwise searched'''
+    bass, mask = chordKey(symbol)
+    if frets == DbFrets and os.path.exists(path):
+        db = VoicingDb(path)
+        try:
+            found = db.lookup(tuning, bass, mask)
+        finally:
+            db.close()
+        if found is not None:
+            return found
+    return searchVoicings(tuning, bass, mask, frets)
+
+
+def voicingName(voicing):
+    '''a voicing low string first, e.g. "x32010"; frets above 9 are
+    separated by dashes'''
+    frets = ['x' if f is None else str(f) for f in reversed(voicing)]
+    sep = '-' if any(len(f) > 1 for f in frets) else ''
+    return sep.join(frets)